@@ -0,0 +1,72 @@
+"""
+Open API 응답 파싱 마이크로벤치마크
+
+- 기존 방식: bytes → decode → 오류 문구 문자열 검색 → encode → ET.fromstring → find
+- 신규 방식: law_xml.find_first (bytes 순차 파싱, 첫 요소에서 중단, 오류는 구조로 판별)
+
+samples/의 XML은 실제 API 응답이 아니라 Open API 응답 구조(요소 이름·순서, CDATA, 오류 응답)만
+본떠 만든 합성 데이터입니다. 법령명·ID·법령구분·공포일자 등의 값과 링크의 OC=test는 임의 값이므로
+파싱 속도 비교에만 사용하고, 필드 값의 정확성 검증에는 쓰지 않습니다.
+
+실행: python benchmarks/bench_law_xml.py [반복 횟수]
+"""
+
+import os
+import sys
+import timeit
+import xml.etree.ElementTree as ET
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(BASE_DIR), "src"))
+
+import law_xml  # noqa: E402
+from law_api import extract_law_fields  # noqa: E402
+
+SAMPLES_DIR = os.path.join(BASE_DIR, "samples")
+SAMPLES = [
+    ("eflaw_search.xml", "eflaw"),
+    ("admrul_search.xml", "admrul"),
+    ("eflaw_bulk_page.xml", "eflaw"),
+    ("error_service_key.xml", "eflaw"),
+]
+LEGACY_MARKERS = ["인증되지 않은", "ErrorCode", "SERVICE_KEY_IS_NOT_REGISTERED"]
+
+
+def legacy_parse(raw, target):
+    """변경 전 run_info_update_task의 응답 처리 경로"""
+    content = raw.decode("utf-8", errors="replace")
+    if any(msg in content for msg in LEGACY_MARKERS):
+        return None
+    root = ET.fromstring(content.encode("utf-8"))
+    law_node = root.find(f".//{target}")
+    return extract_law_fields(law_node) if law_node is not None else None
+
+
+def new_parse(raw, target):
+    try:
+        return law_xml.find_first(raw, target, extract_law_fields)
+    except law_xml.ApiErrorResponse:
+        return None
+
+
+def bench(func, raw, target, number):
+    return min(timeit.repeat(lambda: func(raw, target), number=number, repeat=5)) / number
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    print(f"parser: {'lxml' if law_xml.HAS_LXML else 'xml.etree (lxml 미설치)'}, 반복 {number}회")
+    print(f"{'sample':<26}{'bytes':>8}{'legacy(us)':>12}{'new(us)':>10}{'speedup':>9}")
+    for filename, target in SAMPLES:
+        with open(os.path.join(SAMPLES_DIR, filename), "rb") as f:
+            raw = f.read()
+        assert legacy_parse(raw, target) == new_parse(raw, target), filename
+        legacy = bench(legacy_parse, raw, target, number)
+        new = bench(new_parse, raw, target, number)
+        print(
+            f"{filename:<26}{len(raw):>8}{legacy * 1e6:>12.1f}{new * 1e6:>10.1f}{legacy / new:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
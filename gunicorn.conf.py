@@ -0,0 +1,24 @@
+# gunicorn 설정 (실행: gunicorn -c gunicorn.conf.py)
+# 작업 상태와 수집 결과는 output/state.sqlite3(STATE_STORE_PATH)에 있으므로
+# 어느 작업자 프로세스에서든 상태·결과를 조회할 수 있습니다.
+import os
+
+# src/ 모듈을 평면 import로 사용하므로 src를 경로에 추가
+pythonpath = os.path.join(os.path.dirname(os.path.abspath(__file__)), "src")
+wsgi_app = "app:app"
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("WEB_CONCURRENCY", "4"))
+# 백그라운드 작업은 요청을 받은 작업자의 스레드에서 실행되므로 스레드 작업자 사용
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", "8"))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = 30
+
+# SQLite 연결·Playwright는 fork 이후 각 작업자에서 만들어야 하므로 미리 로드하지 않음
+preload_app = False
+# 작업자 재시작은 실행 중인 작업을 중단시키므로 요청 수 기반 재시작은 사용하지 않음
+max_requests = 0
+
+accesslog = "-"
+errorlog = "-"
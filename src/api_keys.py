@@ -0,0 +1,160 @@
+import os
+import re
+import threading
+import time
+from urllib.parse import unquote
+
+# --- Constants ---
+# 여러 개의 키는 쉼표로 구분하여 입력할 수 있습니다
+KEY_ENV_VARS = ["DATA_GO_KR_API_KEY", "LAW_API_KEY_PERSONAL", "LAW_API_KEY_CORPORATE"]
+QUOTA_ERROR_MARKERS = ["LIMITED_NUMBER_OF_SERVICE_REQUESTS", "트래픽", "한도"]
+
+
+class ApiKey:
+    """API 키 하나와 사용량/오류 통계"""
+
+    def __init__(self, name, value):
+        self.name = name
+        self.value = value
+        # ServiceKey 여부 판별 고도화 (Base64 특성 및 길이 확인)
+        # data.go.kr 서비스키는 보통 +, /, = 등이 포함되거나 60자 이상의 긴 문자열임
+        self.is_base64 = bool(re.search(r"[+/=]", value)) or len(value) > 80
+        self.requests = 0
+        self.errors = 0
+        self.auth_errors = 0
+        self.quota_errors = 0
+        self.consecutive_auth_errors = 0
+        self.in_flight = 0
+        self.benched_until = 0.0
+        self.last_error = ""
+
+    @property
+    def masked(self):
+        return self.value[:4] + "…" if len(self.value) > 4 else "…"
+
+
+class ApiKeyPool:
+    """설정된 모든 키에 조회를 분산하고, 한도/인증 오류가 난 키는 일정 시간 제외합니다.
+
+    - quota 오류: 즉시 bench_seconds 동안 제외
+    - auth 오류: auth_threshold회 연속 발생 시 bench_seconds 동안 제외
+    """
+
+    def __init__(self, keys, bench_seconds=3600, auth_threshold=6):
+        self.keys = keys
+        self.bench_seconds = bench_seconds
+        self.auth_threshold = auth_threshold
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def acquire(self, exclude=()):
+        """제외되지 않은 키 중 진행 중인 요청과 누적 사용량이 가장 적은 키를 반환합니다."""
+        now = time.time()
+        with self._lock:
+            candidates = [
+                k
+                for k in self.keys
+                if k.benched_until <= now and not any(k is e for e in exclude)
+            ]
+            if not candidates:
+                return None
+            key = min(candidates, key=lambda k: (k.in_flight, k.requests))
+            key.in_flight += 1
+            return key
+
+    def release(self, key):
+        with self._lock:
+            key.in_flight -= 1
+
+    def record_request(self, key):
+        with self._lock:
+            key.requests += 1
+
+    def record_success(self, key):
+        with self._lock:
+            key.consecutive_auth_errors = 0
+
+    def record_error(self, key, reason, kind="error"):
+        """kind: 'error'(일반), 'auth'(인증 실패), 'quota'(사용 한도 초과)"""
+        with self._lock:
+            key.errors += 1
+            key.last_error = reason
+            if kind == "quota":
+                key.quota_errors += 1
+                self._bench(key)
+            elif kind == "auth":
+                key.auth_errors += 1
+                key.consecutive_auth_errors += 1
+                if key.consecutive_auth_errors >= self.auth_threshold:
+                    self._bench(key)
+
+    def _bench(self, key):
+        key.benched_until = time.time() + self.bench_seconds
+        key.consecutive_auth_errors = 0
+        print(
+            f"WARNING: API key {key.name} ({key.masked}) benched for {self.bench_seconds:.0f}s: {key.last_error}"
+        )
+
+    def stats(self):
+        now = time.time()
+        with self._lock:
+            return [
+                {
+                    "name": k.name,
+                    "key": k.masked,
+                    "type": "ServiceKey" if k.is_base64 else "OC ID",
+                    "requests": k.requests,
+                    "errors": k.errors,
+                    "auth_errors": k.auth_errors,
+                    "quota_errors": k.quota_errors,
+                    "in_flight": k.in_flight,
+                    "benched": k.benched_until > now,
+                    "benched_for": round(max(0.0, k.benched_until - now)),
+                    "last_error": k.last_error,
+                }
+                for k in self.keys
+            ]
+
+
+def load_keys():
+    """환경 변수에서 API 키 목록을 읽습니다 (공백·중복·예시값 제외)."""
+    keys = []
+    seen = set()
+    for env_name in KEY_ENV_VARS:
+        values = [v.strip() for v in os.environ.get(env_name, "").split(",")]
+        for idx, raw in enumerate(v for v in values if v):
+            if "your_" in raw:
+                continue
+            # 인증키 처리 (이미 인코딩된 경우 대응)
+            value = unquote(raw)
+            if value in seen:
+                continue
+            seen.add(value)
+            name = env_name if idx == 0 else f"{env_name}[{idx}]"
+            keys.append(ApiKey(name, value))
+    return keys
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_key_pool():
+    """프로세스 공용 키 풀 (키가 하나도 없으면 None)
+
+    LAW_API_KEY_BENCH_SECONDS, LAW_API_KEY_AUTH_THRESHOLD 로 제외 기준을 설정합니다.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            keys = load_keys()
+            if not keys:
+                return None
+            _pool = ApiKeyPool(
+                keys,
+                bench_seconds=float(os.environ.get("LAW_API_KEY_BENCH_SECONDS", "3600")),
+                auth_threshold=int(os.environ.get("LAW_API_KEY_AUTH_THRESHOLD", "6")),
+            )
+        return _pool
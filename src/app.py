@@ -1,13 +1,47 @@
-from flask import Flask, render_template, jsonify, send_file, request
+from flask import (
+    Flask,
+    render_template,
+    jsonify,
+    send_file,
+    request,
+    Response,
+    stream_with_context,
+)
+import json
+import zlib
 import pandas as pd
 import os
+import time
 from datetime import datetime
-import threading
-import requests
-import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
 from scraper import scrape_ftc_law_data
-from urllib.parse import unquote, quote
+import http_client
+import metrics
+import profiling
+from api_keys import get_key_pool
+from law_api import (
+    lookup_law,
+    lookup_target,
+    fetch_law_index,
+    endpoint_status,
+    FAILED_INFO,
+)
+from law_cache import LawInfoCache
+from jobs import (
+    JobManager,
+    JobCancelled,
+    FAILED,
+    FINISHED_STATES,
+    INTERACTIVE,
+    BULK,
+    retry_with_backoff,
+)
+from state_store import get_state_store
+from response_cache import CachedJsonResponder
+from law_index import LawIndex, DATE_FIELDS, parse_date
+from pdf_render import safe_filename, PDF_HEADER_FIELDS
+from worker import run_worker, POLL_INTERVAL
 
 # .env 파일 로드 (루트 디렉토리의 .env 로드)
 load_dotenv(
@@ -16,326 +50,783 @@ load_dotenv(
 
 app = Flask(__name__)
 
-# 전역 변수로 진행 상황 및 데이터 저장
-scraping_status = {
-    "is_running": False,
-    "progress": 0,
-    "total": 0,
-    "current_category": "",
-    "data": [],
-    "pdf_zip_path": None,
-    "target_dir": None,
-}
-
 OUTPUT_DIR = os.path.join(
     os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "output"
 )
 if not os.path.exists(OUTPUT_DIR):
     os.makedirs(OUTPUT_DIR)
 
+# 작업 상태·수집 결과·PDF 압축 파일 경로 공유 저장소 (gunicorn 작업자 간 공유)
+state_store = get_state_store(OUTPUT_DIR)
+# 이 프로세스의 지표를 주기적으로 저장소에 기록 (/metrics는 모든 프로세스의 지표를 합쳐 출력)
+metrics.REGISTRY.start_flusher(state_store)
+
+# 카테고리 동시 수집 작업자 수 (FTC 요청 속도는 scraper.ftc_limiter가 제한)
+SCRAPE_WORKERS = int(os.environ.get("FTC_SCRAPE_WORKERS", "4"))
+# 시행/개정 정보 캐시 (법령명·조회 대상 단위, 유효 시간: LAW_CACHE_TTL_HOURS)
+law_info_cache = LawInfoCache(
+    os.path.join(OUTPUT_DIR, "law_cache.sqlite3"),
+    ttl=float(os.environ.get("LAW_CACHE_TTL_HOURS", "24")) * 3600,
+)
 
-@app.route("/")
-def index():
-    return render_template("index.html")
-
+# 시행/개정 정보 동시 조회 수 (동시에 진행 중인 API 요청 수 상한)
+API_LOOKUP_WORKERS = int(os.environ.get("LAW_API_CONCURRENCY", "8"))
 
-@app.route("/api/scrape/start", methods=["POST"])
-def start_scrape():
-    global scraping_status
-    if scraping_status["is_running"]:
-        return jsonify({"status": "error", "message": "이미 스크래핑이 진행 중입니다."})
 
-    target_cd = request.json.get("target_cd", "1")
-    scraping_status["is_running"] = True
-    scraping_status["progress"] = 0
-    scraping_status["data"] = []
+def parse_job_limits(value):
+    """JOB_LIMITS 형식("scrape=1,info=1,pdf=1")을 작업 종류별 동시 실행 수로 변환합니다."""
+    limits = {}
+    for part in value.split(","):
+        job_type, _, limit = part.partition("=")
+        if job_type.strip() and limit.strip().isdigit():
+            limits[job_type.strip()] = max(1, int(limit))
+    return limits
 
-    thread = threading.Thread(target=run_scraping_task, args=(target_cd,))
-    thread.start()
 
-    return jsonify({"status": "success", "message": "스크래핑을 시작합니다."})
+# 작업 관리자 (작업 종류별 동시 실행 수: JOB_LIMITS, interactive 작업은 JOB_INTERACTIVE_LIMITS,
+# heartbeat가 JOB_STALE_SECONDS초 끊긴 작업은 실패 처리되어 이어서 실행 가능)
+job_manager = JobManager(
+    state_store,
+    limits=parse_job_limits(os.environ.get("JOB_LIMITS", "")),
+    stale_after=float(os.environ.get("JOB_STALE_SECONDS", "60")),
+    interactive_limits=parse_job_limits(os.environ.get("JOB_INTERACTIVE_LIMITS", "")),
+)
+# 항목(items)을 이 수 이하로 지정한 정보 조회·PDF 요청은 interactive 작업으로 실행
+INTERACTIVE_MAX_ITEMS = int(os.environ.get("JOB_INTERACTIVE_MAX_ITEMS", "10"))
+
+# 수집 결과 직렬화 캐시 (data_version이 바뀔 때만 저장소에서 다시 읽음)
+_results_cache = (-1, [], "[]")
+# 결과 조회 필터 (쿼리 인자 → 컬럼)
+RESULT_FILTERS = {"category": "법령명", "법령명": "법령명", "구분": "구분", "담당부서": "담당부서"}
+# 결과 조회 응답 (ETag 304, gzip/br 압축 본문 재사용)
+results_responder = CachedJsonResponder(app)
+law_query_responder = CachedJsonResponder(app)
+# 결과 조회 색인 (data_version이 바뀔 때만 다시 생성)
+_law_index = LawIndex([], -1)
+
+# 진행 이벤트 스트림: 저장소 확인 주기(초), keep-alive 주석 전송 간격(초),
+# 한 번에 보내는 변경 행 수 상한 (넘으면 reload 이벤트로 전체 재조회 유도)
+SSE_POLL_INTERVAL = float(os.environ.get("SSE_POLL_INTERVAL", "0.5"))
+SSE_KEEPALIVE = 15.0
+SSE_MAX_ROW_DELTA = 200
+# 보관하는 수집 실행(run) 수 (output/state.sqlite3, 재시작 후에도 마지막 결과를 바로 사용)
+RESULT_RUNS_KEEP = int(os.environ.get("RESULT_RUNS_KEEP", "5"))
+# 항목(카테고리·법령·PDF)별 최대 시도 횟수와 재시도 대기 기준(초, 시도마다 2배)
+JOB_ITEM_ATTEMPTS = int(os.environ.get("JOB_ITEM_ATTEMPTS", "3"))
+JOB_RETRY_BACKOFF = float(os.environ.get("JOB_RETRY_BACKOFF", "2"))
+# 시행/개정 정보 결과를 저장소에 반영하는 주기(초)와 최대 누적 건수
+RESULT_FLUSH_INTERVAL = 1.0
+RESULT_FLUSH_SIZE = 20
+# PDF 렌더링 방식: local(웹 서버의 작업 스레드도 대기열 처리) / queue(worker.py 작업자만 처리)
+PDF_RENDER_MODE = os.environ.get("PDF_RENDER_MODE", "local").strip().lower()
+# 렌더링 항목 임대 시간(초): 작업자가 이 시간 안에 결과를 기록하지 않으면 다른 작업자가 재처리
+RENDER_LEASE_SECONDS = float(os.environ.get("RENDER_LEASE_SECONDS", "180"))
+# 동시에 렌더링하는 페이지 수와 페이지 한 건 로딩 제한 시간(초)
+PDF_RENDER_CONCURRENCY = int(os.environ.get("PDF_RENDER_CONCURRENCY", "4"))
+PDF_PAGE_TIMEOUT = float(os.environ.get("PDF_PAGE_TIMEOUT", "60"))
+
+
+def load_results():
+    """(data_version, 수집 결과 행 목록, JSON 문자열)을 반환합니다. 반환된 목록은 수정하지 않습니다."""
+    global _results_cache
+    if state_store.data_version() != _results_cache[0]:
+        version, rows = state_store.get_rows()
+        _results_cache = (version, rows, app.json.dumps(rows))
+    return _results_cache
+
+
+def get_law_index():
+    """현재 data_version의 조회 색인 (law_index.LawIndex)"""
+    global _law_index
+    version, rows, _ = load_results()
+    if _law_index.version != version:
+        _law_index = LawIndex(rows, version)
+    return _law_index
+
+
+def parse_items(value):
+    """요청의 items(결과 행 번호 목록)를 검증해 중복 없는 정렬된 목록으로 반환합니다.
+
+    반환값: 행 번호 목록, 지정하지 않았으면 None
+    (목록이 아니거나 0 이상의 정수가 아닌 값이 있으면 ValueError, bool·실수는 허용하지 않음)
+    """
+    if value is None:
+        return None
+    if not isinstance(value, list) or not value:
+        raise ValueError("items는 행 번호 목록이어야 합니다.")
+    if any(isinstance(i, bool) or not isinstance(i, int) or i < 0 for i in value):
+        raise ValueError("items는 0 이상의 정수 목록이어야 합니다.")
+    return sorted(set(value))
+
+
+def items_lane(items):
+    """지정한 항목 수가 적은 요청은 bulk 작업보다 먼저 처리되는 interactive 작업으로 실행"""
+    return INTERACTIVE if items is not None and len(items) <= INTERACTIVE_MAX_ITEMS else BULK
+
+
+def profile_option(options):
+    """요청의 profile 옵션(true 또는 "sample")을 프로파일링 방식으로 변환합니다.
+
+    지정하지 않으면 JOB_PROFILE 설정을 따릅니다 (기본: 프로파일링 안 함).
+    """
+    value = options.get("profile", os.environ.get("JOB_PROFILE", ""))
+    if value is True or value in ("1", "true"):
+        return "spans"
+    return value if value in profiling.MODES else None
+
+
+def failed_items_error(label, names, limit=10):
+    """실패 항목으로 작업을 failed로 끝낼 때의 오류 메시지 (항목은 최대 limit개까지 표시)
+
+    failed 작업은 이어서 실행할 수 있고, 이어서 실행하면 실패한 항목만 다시 처리합니다.
+    """
+    shown = ", ".join(str(name) for name in names[:limit])
+    if len(names) > limit:
+        shown += f" 외 {len(names) - limit}건"
+    return f"{label} {len(names)}건 실패: {shown} (이어서 실행하면 실패한 항목만 다시 처리합니다)"
+
+
+def job_response(job, error, message):
+    if job is None:
+        return jsonify({"status": "error", "message": error})
+    return jsonify({"status": "success", "message": message, "job_id": job.id})
 
 
-def run_scraping_task(target_cd):
-    global scraping_status
-    all_dfs = []
+@app.route("/")
+def index():
+    return render_template("index.html")
 
-    try:
-        if target_cd == "all":
-            cds = [f"{i:02d}" for i in range(1, 15)]
-        else:
-            cds = [target_cd]
 
-        scraping_status["total"] = 0
-        scraping_status["progress"] = 0
+@app.route("/api/scrape/start", methods=["POST"])
+def start_scrape():
+    options = request.get_json(silent=True) or {}
+    target_cd = options.get("target_cd", "1")
+    # 단일 카테고리 수집은 전체 수집(bulk)과 별도로 바로 실행
+    lane = BULK if target_cd == "all" else INTERACTIVE
+    job, error = job_manager.submit(
+        "scrape", run_scraping_task, {"target_cd": target_cd}, lane, profile_option(options)
+    )
+    return job_response(job, error, "스크래핑을 시작합니다.")
+
+
+def scrape_category(job, cd):
+    """카테고리 하나를 수집합니다. 빈 결과(요청 실패 포함)는 백오프 후 다시 시도합니다."""
+    job.check_cancelled()
+    job.yield_to_interactive()
+
+    def attempt():
+        df = scrape_ftc_law_data(int(cd))
+        if df is None or df.empty:
+            raise RuntimeError(f"카테고리 {cd}: 수집 결과 없음")
+        with profiling.span("to_records"):
+            return df.to_dict("records")
+
+    with job.span("category", cd):
+        return retry_with_backoff(job, attempt, JOB_ITEM_ATTEMPTS, JOB_RETRY_BACKOFF)
+
+
+def run_scraping_task(job, target_cd):
+    if target_cd == "all":
+        cds = [f"{i:02d}" for i in range(1, 15)]
+    else:
+        cds = [target_cd]
+
+    # 수집한 카테고리는 바로 저장소(run_parts)에 기록하고, 완료 시 카테고리 순서대로
+    # 합쳐 현재 결과로 지정. 이어서 실행하면 이미 기록된 카테고리는 건너뜀
+    run_id = job.extra.get("run_id")
+    if not run_id:
+        run_id = state_store.create_run(job.id, {"target_cd": target_cd})
+        job.set_extra(run_id=run_id)
+    parts = state_store.get_run_parts(run_id)
+    remaining = [idx for idx in range(len(cds)) if idx not in parts]
+    total_laws = sum(len(rows) for rows in parts.values())
+    done = len(cds) - len(remaining)
+    job.set_extra(failed_items=[])
+    job.update(
+        progress=total_laws,
+        total=total_laws,
+        message=f"카테고리 수집 중... ({done}/{len(cds)})",
+    )
 
-        for idx, cd in enumerate(cds):
-            cd_int = int(cd)
-            scraping_status["current_category"] = (
-                f"카테고리 {cd} 수집 중... ({idx+1}/{len(cds)})"
+    workers = max(1, min(SCRAPE_WORKERS, len(cds)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(scrape_category, job, cds[idx]): idx for idx in remaining}
+        for future in as_completed(futures):
+            if job.cancel_requested:
+                for pending in futures:
+                    pending.cancel()
+                job.check_cancelled()
+            idx = futures[future]
+            rows, _, error = future.result()
+            done += 1
+            if error is not None:
+                # 실패한 카테고리는 run_parts에 기록하지 않으므로 이어서 실행할 때 다시 수집
+                print(f"WARNING: {error}")
+                job.set_extra(failed_items=job.extra["failed_items"] + [cds[idx]])
+            else:
+                with job.span("store", cds[idx]):
+                    state_store.add_run_part(run_id, idx, rows)
+                total_laws += len(rows)
+            job.update(
+                progress=total_laws,
+                total=total_laws,
+                message=f"카테고리 수집 중... ({done}/{len(cds)})",
             )
-            df = scrape_ftc_law_data(cd_int)
-            if not df.empty:
-                all_dfs.append(df)
-                total_laws = sum(len(d) for d in all_dfs)
-                scraping_status["total"] = total_laws
-                scraping_status["progress"] = total_laws
-
-        if all_dfs:
-            combined_df = pd.concat(all_dfs, ignore_index=True)
-            scraping_status["data"] = combined_df.to_dict("records")
-            scraping_status["total"] = len(scraping_status["data"])
-            scraping_status["progress"] = len(scraping_status["data"])
-
-    except Exception as e:
-        print(f"Scraping error: {e}")
-    finally:
-        scraping_status["is_running"] = False
-        scraping_status["current_category"] = "완료"
+
+    failed = job.extra["failed_items"]
+    if failed:
+        # 일부 카테고리만 수집된 결과로 현재 결과를 바꾸지 않고 작업을 failed로 끝냄
+        # (수집한 카테고리는 run_parts에 남아 있어 이어서 실행하면 실패한 카테고리만 수집)
+        raise RuntimeError(failed_items_error("카테고리", sorted(failed)))
+    with job.span("merge"):
+        count = state_store.finish_run(run_id, keep=RESULT_RUNS_KEEP)
+    if not count:
+        # FTC 장애 등으로 수집 결과가 비었으면 현재 결과를 그대로 유지
+        raise RuntimeError("수집된 법령이 없어 현재 결과를 유지합니다.")
+    job.update(progress=count, total=count, message="완료")
 
 
 @app.route("/api/scrape/info", methods=["POST"])
 def scrape_info():
-    global scraping_status
-    if not scraping_status["data"]:
+    if not state_store.row_count():
         return jsonify(
             {"status": "error", "message": "먼저 데이터 수집을 완료해주세요."}
         )
 
-    if scraping_status["is_running"]:
+    if get_key_pool() is None:
         return jsonify(
-            {"status": "error", "message": "이미 다른 작업이 진행 중입니다."}
+            {"status": "error", "message": "API 키를 설정해주세요 (.env 파일)"}
         )
 
-    scraping_status["is_running"] = True
-    scraping_status["progress"] = 0
-    scraping_status["total"] = len(scraping_status["data"])
-
-    thread = threading.Thread(target=run_info_update_task)
-    thread.start()
-
-    return jsonify(
-        {
-            "status": "success",
-            "message": "API를 이용한 시행/개정 정보 수집을 시작합니다.",
-        }
+    # force_refresh: 캐시를 무시하고 모든 항목을 API로 다시 조회
+    # bulk: 소관부처 목록을 페이지 단위로 받아 로컬에서 매칭 (기본값: LAW_API_BULK)
+    # items: 조회할 결과 행 번호 목록 (생략 시 전체)
+    options = request.get_json(silent=True) or {}
+    try:
+        items = parse_items(options.get("items"))
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    params = {
+        "force_refresh": bool(options.get("force_refresh")),
+        # 일부 항목만 조회할 때는 목록 일괄 조회가 오히려 느리므로 단건 조회
+        "bulk": items is None
+        and bool(options.get("bulk", os.environ.get("LAW_API_BULK", "1") != "0")),
+    }
+    if items is not None:
+        params["items"] = items
+    job, error = job_manager.submit(
+        "info", run_info_update_task, params, items_lane(items), profile_option(options)
     )
+    return job_response(job, error, "API를 이용한 시행/개정 정보 수집을 시작합니다.")
+
+
+def lookup_item(job, row, key_pool, force_refresh, indexes):
+    """항목 하나를 조회합니다. 일시 오류는 백오프 후 다시 시도합니다.
+
+    반환값: ((정보 또는 None, 캐시 적중 여부) 또는 None, 시도 횟수, 마지막 오류)
+    """
+    job.check_cancelled()
+    job.yield_to_interactive()
+    with job.span("lookup", row["법령명_상세"]):
+        return retry_with_backoff(
+            job,
+            lambda: lookup_law(
+                row["법령명_상세"],
+                row.get("구분", ""),
+                key_pool,
+                law_info_cache,
+                force_refresh,
+                indexes,
+                raise_on_error=True,
+            ),
+            JOB_ITEM_ATTEMPTS,
+            JOB_RETRY_BACKOFF,
+        )
 
 
-def run_info_update_task():
-    global scraping_status
-    import time
-    from urllib.parse import unquote, quote
-    import re
-
-    # 1. API 키 로드 (공백 제거)
-    api_personal = os.environ.get("LAW_API_KEY_PERSONAL", "").strip()
-    api_corporate = os.environ.get("LAW_API_KEY_CORPORATE", "").strip()
-    api_key_raw = (
-        os.environ.get("DATA_GO_KR_API_KEY", "").strip()
-        or api_personal
-        or api_corporate
+def run_info_update_task(job, force_refresh=False, bulk=False, items=None):
+    key_pool = get_key_pool()
+    # 이어서 실행할 때는 처음 실행한 수집 결과(run)가 그대로일 때만 진행
+    run_id = job.extra.get("run_id")
+    if run_id and run_id != state_store.active_run():
+        raise RuntimeError("수집 결과가 바뀌어 이어서 실행할 수 없습니다.")
+    run_id = state_store.active_run()
+    _, data_list = state_store.get_rows()
+    targets = range(len(data_list)) if items is None else [i for i in items if 0 <= i < len(data_list)]
+    total = len(targets)
+    done_items = job.completed_items()
+    job.update(total=total)
+    job.set_extra(
+        run_id=run_id,
+        cache_hits=job.extra.get("cache_hits", 0),
+        cache_misses=job.extra.get("cache_misses", 0),
+        failed_items=0,
     )
 
-    if not api_key_raw or "your_" in api_key_raw:
-        scraping_status["is_running"] = False
-        scraping_status["current_category"] = "오류: API 키를 설정해주세요 (.env 파일)"
-        return
-
-    # 인증키 처리 (이미 인코딩된 경우 대응)
-    api_key = unquote(api_key_raw)
-
-    # ServiceKey 여부 판별 고도화 (Base64 특성 및 길이 확인)
-    # data.go.kr 서비스키는 보통 +, /, = 등이 포함되거나 60자 이상의 긴 문자열임
-    is_base64 = bool(re.search(r"[+/=]", api_key)) or len(api_key) > 80
+    print(
+        f"INFO: API Update Task Started. Job: {job.id}. Target: {total} items"
+        f" ({len(done_items)} already done). Keys: "
+        + ", ".join(
+            f"{k.name}({'ServiceKey' if k.is_base64 else 'OC ID'})" for k in key_pool.keys
+        )
+    )
 
-    data_list = scraping_status["data"]
+    # 법령명이 없는 항목과 이전 실행에서 완료한 항목은 조회 없이 완료 처리
+    pending = [
+        i
+        for i in targets
+        if data_list[i].get("법령명_상세", "") and str(i) not in done_items
+    ]
+    completed = total - len(pending)
+    job.update(progress=completed)
+
+    # 일괄 모드: 캐시에 없는 항목의 조회 대상별로 목록 색인을 한 번만 생성
+    indexes = {}
+    if bulk:
+        targets = set()
+        for i in pending:
+            name = data_list[i]["법령명_상세"]
+            target = lookup_target(data_list[i].get("구분", ""))
+            if force_refresh or law_info_cache.get(name, target) is None:
+                targets.add(target)
+        for target in sorted(targets):
+            job.check_cancelled()
+            job.update(message=f"{target} 법령 목록 일괄 조회 중...")
+            with job.span("bulk_index", target):
+                indexes[target] = fetch_law_index(target, key_pool)
+
+    # 동시 조회 수 제한 (엔드포인트별 초당 요청 수는 law_api.endpoint_limiter가 제한)
+    workers = max(1, API_LOOKUP_WORKERS)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(
+                lookup_item, job, data_list[i], key_pool, force_refresh, indexes
+            ): i
+            for i in pending
+        }
+        # 결과 반영과 진행률 갱신은 이 스레드에서만 수행
+        # 저장소에는 RESULT_FLUSH_INTERVAL초 또는 RESULT_FLUSH_SIZE건마다 묶어서 기록하고,
+        # 기록한 행만 작업 기록(checkpoint)에 완료로 남김
+        updates = {}
+        journal = []
+        failed_names = []
+        last_flush = time.monotonic()
+
+        def flush():
+            if updates:
+                with job.span("store", len(updates)):
+                    state_store.update_rows(updates, run_id)
+                    job.checkpoint_many(journal)
+                updates.clear()
+                journal.clear()
+
+        try:
+            for future in as_completed(futures):
+                if job.cancel_requested:
+                    # 아직 시작하지 않은 조회는 취소하고, 끝난 결과까지만 반영
+                    for pending_future in futures:
+                        pending_future.cancel()
+                    job.check_cancelled()
+                i = futures[future]
+                result, attempts, error = future.result()
+                if error is not None:
+                    print(f"WARNING: {error} ({attempts}회 시도)")
+                    info, cache_hit = None, False
+                    journal.append((i, "failed", attempts, str(error), None))
+                    failed_names.append(data_list[i]["법령명_상세"])
+                    job.incr_extra("failed_items")
+                else:
+                    info, cache_hit = result
+                    journal.append((i, "done", attempts, None, None))
+                data_list[i].update(info or FAILED_INFO)
+                updates[i] = data_list[i]
+                if (
+                    len(updates) >= RESULT_FLUSH_SIZE
+                    or time.monotonic() - last_flush >= RESULT_FLUSH_INTERVAL
+                ):
+                    flush()
+                    last_flush = time.monotonic()
+                job.incr_extra("cache_hits" if cache_hit else "cache_misses")
+                completed += 1
+                job.update(
+                    progress=completed,
+                    message=f"[{completed}/{total}] {data_list[i]['법령명_상세']} API 조회 완료",
+                )
+        finally:
+            flush()
 
     print(
-        f"INFO: API Update Task Started. Target: {len(data_list)} items. Detected Type: {'ServiceKey' if is_base64 else 'OC ID'}"
+        f"INFO: API Update Task Finished. Job: {job.id}. Cache hits: {job.extra['cache_hits']}, misses: {job.extra['cache_misses']}, failed: {job.extra['failed_items']}"
     )
+    if failed_names:
+        # 실패 항목은 작업 기록에 failed로 남아 이어서 실행할 때 다시 조회
+        raise RuntimeError(failed_items_error("조회", failed_names))
+    job.update(message="API 수집 완료")
 
-    for i in range(len(data_list)):
-        item = data_list[i]
-        name = item.get("법령명_상세", "")
-        category_type = item.get("구분", "")
 
-        if not name:
-            scraping_status["progress"] = i + 1
-            continue
+@app.route("/api/jobs")
+def list_jobs():
+    job_type = request.args.get("type")
+    return jsonify(job_manager.list(job_type))
 
-        scraping_status["current_category"] = (
-            f"[{i+1}/{len(data_list)}] {name} API 조회 중..."
-        )
 
-        target = "eflaw"
-        if any(x in category_type for x in ["고시", "지침", "예규", "훈령", "공고"]):
-            target = "admrul"
-
-        success = False
-        # 시도할 설정들 (공공데이터포털 vs 국가법령정보센터)
-        configs = []
-        if is_base64:
-            configs = [
-                {
-                    "url": "http://apis.data.go.kr/1170000/law/lawSearchList.do",
-                    "param": "serviceKey",
-                },
-                {"url": "http://www.law.go.kr/DRF/lawSearch.do", "param": "OC"},
-            ]
-        else:
-            configs = [
-                {"url": "http://www.law.go.kr/DRF/lawSearch.do", "param": "OC"},
-                {
-                    "url": "http://apis.data.go.kr/1170000/law/lawSearchList.do",
-                    "param": "serviceKey",
-                },
-            ]
-
-        for cfg in configs:
-            try:
-                params = {
-                    cfg["param"]: api_key,
-                    "target": target,
-                    "type": "XML",
-                    "query": name,
-                    "mobileYn": "Y",
-                }
-
-                response = requests.get(
-                    cfg["url"], params=params, timeout=10, verify=False
-                )
+@app.route("/api/jobs/<job_id>")
+def get_job(job_id):
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": "작업을 찾을 수 없습니다."}), 404
+    resp = jsonify(job)
+    resp.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
+    return resp
 
-                if response.status_code == 200:
-                    content = response.content.decode("utf-8", errors="replace")
-
-                    # 인증 오류 키워드 체크
-                    if any(
-                        msg in content
-                        for msg in [
-                            "인증되지 않은",
-                            "ErrorCode",
-                            "SERVICE_KEY_IS_NOT_REGISTERED",
-                        ]
-                    ):
-                        print(
-                            f"DEBUG: Auth failure on {cfg['url']} for {name}, trying next config..."
-                        )
-                        continue
-
-                    # 정상 XML 파싱 시도
-                    try:
-                        root = ET.fromstring(content.encode("utf-8"))
-                        law_node = root.find(f".//{target}")
-
-                        if law_node is not None:
-                            impl_date = (
-                                law_node.findtext("시행일자")
-                                or law_node.findtext("발령일자")
-                                or ""
-                            )
-                            if len(impl_date) == 8:
-                                impl_date = f"{impl_date[:4]}. {impl_date[4:6]}. {impl_date[6:8]}."
-
-                            pnt_no = (
-                                law_node.findtext("공포번호")
-                                or law_node.findtext("발령번호")
-                                or ""
-                            )
-                            pnt_date = (
-                                law_node.findtext("공포일자")
-                                or law_node.findtext("발령일자")
-                                or ""
-                            )
-                            if len(pnt_date) == 8:
-                                pnt_date = (
-                                    f"{pnt_date[:4]}. {pnt_date[4:6]}. {pnt_date[6:8]}."
-                                )
-
-                            cat_name = (
-                                law_node.findtext("법령구분명")
-                                or law_node.findtext("행정규칙종류명")
-                                or category_type
-                            )
-                            rev_name = law_node.findtext("제개정구분명") or "-"
-
-                            full_info = f"[시행 {impl_date}] [{cat_name} 제{pnt_no}호, {pnt_date}, {rev_name}]"
-
-                            data_list[i].update(
-                                {
-                                    "시행/개정": full_info,
-                                    "시행일": impl_date or "-",
-                                    "개정유형": rev_name,
-                                    "개정정보": (
-                                        f"{cat_name} 제{pnt_no}호" if pnt_no else "-"
-                                    ),
-                                    "개정일": pnt_date or "-",
-                                }
-                            )
-                            success = True
-                            break  # 성공 시 다음 설정 시도 중단
-                    except:
-                        continue  # 파싱 에러 시 다음 설정 시도
-                else:
-                    # 401/403 등 오류 시 다음 설정 시도
-                    print(
-                        f"DEBUG: HTTP {response.status_code} on {cfg['url']}, trying next..."
-                    )
-                    continue
-
-            except Exception as e:
-                print(f"DEBUG: Connection error on {cfg['url']}: {e}")
-                continue
-
-        if not success:
-            # 모든 시도가 실패한 경우
-            data_list[i].update(
-                {
-                    "시행/개정": "인증/조회 실패",
-                    "시행일": "API 오류 (키 확인)",
-                    "개정유형": "-",
-                    "개정정보": "-",
-                    "개정일": "-",
-                }
+
+def sse_event(event, data, event_id=None):
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append("data: " + json.dumps(data, ensure_ascii=False))
+    return "\n".join(lines) + "\n\n"
+
+
+def job_event_stream(job_id, since):
+    """작업 상태가 바뀔 때만 이벤트를 보냅니다.
+
+    - progress: 진행률·캐시 통계 (progress, total, extra)
+    - item: 현재 처리 중인 항목 메시지
+    - rows: since 이후 바뀐 결과 행 (id: data_version)
+    - reload: 바뀐 행이 너무 많으면 행 대신 전체 재조회 요청
+    - done: 종료된 작업 상태 (이후 스트림 종료)
+    """
+    last_progress = last_message = None
+    last_sent = time.monotonic()
+    while True:
+        job = job_manager.get(job_id)
+        if job is None:
+            yield sse_event("done", {"id": job_id, "state": "missing"})
+            return
+        events = []
+
+        progress = (job["progress"], job["total"], job["extra"])
+        if progress != last_progress:
+            last_progress = progress
+            events.append(
+                sse_event(
+                    "progress",
+                    {"progress": job["progress"], "total": job["total"], "extra": job["extra"]},
+                )
             )
+        if job["message"] != last_message:
+            last_message = job["message"]
+            events.append(sse_event("item", {"message": job["message"]}))
+
+        if since is not None and state_store.data_version() != since:
+            version, rows = state_store.rows_since(since)
+            if len(rows) > SSE_MAX_ROW_DELTA:
+                events.append(sse_event("reload", {"version": version}, version))
+            elif rows:
+                events.append(
+                    sse_event(
+                        "rows",
+                        {"version": version, "rows": [{"idx": i, "row": r} for i, r in rows]},
+                        version,
+                    )
+                )
+            since = version
+
+        if job["state"] in FINISHED_STATES:
+            events.append(sse_event("done", job))
+            yield "".join(events)
+            return
+
+        if events:
+            last_sent = time.monotonic()
+            yield "".join(events)
+        elif time.monotonic() - last_sent >= SSE_KEEPALIVE:
+            last_sent = time.monotonic()
+            yield ": keep-alive\n\n"
+        time.sleep(SSE_POLL_INTERVAL)
+
+
+@app.route("/api/jobs/<job_id>/events")
+def job_events(job_id):
+    """작업 진행 이벤트 스트림 (Server-Sent Events)
+
+    since(또는 재연결 시 Last-Event-ID): 클라이언트가 가진 결과의 data_version.
+    지정하면 이후 바뀐 행을 rows 이벤트로 보냅니다.
+    """
+    if job_manager.get(job_id) is None:
+        return jsonify({"status": "error", "message": "작업을 찾을 수 없습니다."}), 404
+    since = request.headers.get("Last-Event-ID") or request.args.get("since")
+    since = int(since) if since and since.isdigit() else None
+    resp = Response(
+        stream_with_context(job_event_stream(job_id, since)),
+        mimetype="text/event-stream",
+    )
+    resp.headers["Cache-Control"] = "no-cache"
+    # 프록시(nginx) 버퍼링 방지
+    resp.headers["X-Accel-Buffering"] = "no"
+    return resp
 
-        scraping_status["progress"] = i + 1
-        time.sleep(0.1)
 
-    scraping_status["is_running"] = False
-    scraping_status["current_category"] = "API 수집 완료"
+@app.route("/api/jobs/<job_id>/resume", methods=["POST"])
+def resume_job(job_id):
+    """실패·취소된 작업을 마지막 체크포인트부터 이어서 실행합니다 (완료 항목은 건너뜀)."""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": "작업을 찾을 수 없습니다."}), 404
+    resumed, error = job_manager.resume(job_id, JOB_TASKS[job["type"]])
+    return job_response(resumed, error, "작업을 이어서 실행합니다.")
+
+
+@app.route("/api/jobs/<job_id>/profile")
+def job_profile(job_id):
+    """프로파일링한 작업의 단계별 요약, 구간 타임라인, 샘플링 상위 함수
+
+    쿼리: offset, limit(기본 1000, 최대 10000), stage(단계 필터),
+    format=folded(샘플링 결과를 flamegraph용 folded 형식 텍스트로 반환)
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": "작업을 찾을 수 없습니다."}), 404
+    mode = job["extra"].get("profile")
+    if not mode:
+        return jsonify({"status": "error", "message": "프로파일링하지 않은 작업입니다."}), 404
+    folded = state_store.get_value(profiling.KV_PREFIX + job_id) or ""
+    if request.args.get("format") == "folded":
+        return app.response_class(folded, mimetype="text/plain")
+    try:
+        offset = max(0, int(request.args.get("offset", 0)))
+        limit = min(10000, max(1, int(request.args.get("limit", 1000))))
+    except ValueError:
+        return jsonify({"status": "error", "message": "offset/limit는 정수여야 합니다."}), 400
+    total, spans = state_store.job_spans(job_id, offset, limit, request.args.get("stage"))
+    return jsonify(
+        {
+            "job_id": job_id,
+            "mode": mode,
+            "state": job["state"],
+            "started_at": job["started_at"],
+            "finished_at": job["finished_at"],
+            "summary": state_store.span_summary(job_id),
+            "total_spans": total,
+            "offset": offset,
+            "spans": spans,
+            "hot_functions": profiling.hot_functions(folded),
+        }
+    )
+
+
+@app.route("/api/jobs/<job_id>/cancel", methods=["POST"])
+def cancel_job(job_id):
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": "작업을 찾을 수 없습니다."}), 404
+    if not job_manager.cancel(job_id):
+        return jsonify({"status": "error", "message": "이미 종료된 작업입니다."})
+    return jsonify({"status": "success", "message": "작업 취소를 요청했습니다."})
+
+
+@app.route("/api/runs")
+def list_runs():
+    return jsonify(state_store.list_runs())
+
+
+@app.route("/api/runs/<run_id>/activate", methods=["POST"])
+def activate_run(run_id):
+    if job_manager.is_busy():
+        return jsonify({"status": "error", "message": "진행 중인 작업이 끝난 후 변경해주세요."})
+    if not state_store.activate_run(run_id):
+        return jsonify({"status": "error", "message": "완료된 수집 결과를 찾을 수 없습니다."}), 404
+    return jsonify({"status": "success", "message": "선택한 수집 결과를 불러왔습니다."})
+
+
+@app.route("/metrics")
+def prometheus_metrics():
+    """Prometheus 텍스트 형식 지표 (모든 gunicorn 작업자·PDF 렌더링 작업자 합계)"""
+    queue = state_store.render_task_counts()
+    active = state_store.active_job_counts(job_manager.stale_after)
+    gauges = [
+        (
+            "ftc_render_queue_tasks",
+            "PDF 렌더링 대기열 항목 수",
+            [({"state": state}, queue.get(state, 0)) for state in ("pending", "leased", "failed")],
+        ),
+        (
+            "ftc_jobs_active",
+            "진행 중인 작업 수",
+            [({"type": t, "lane": lane}, count) for (t, lane), count in sorted(active.items())],
+        ),
+        ("ftc_result_rows", "현재 수집 결과 행 수", [({}, state_store.row_count())]),
+    ]
+    body = metrics.REGISTRY.render(state_store, gauges)
+    return app.response_class(body, content_type="text/plain; version=0.0.4; charset=utf-8")
 
 
 @app.route("/api/scrape/status")
 def get_status():
+    # 기존 화면 호환용: 진행 중인 작업(없으면 마지막 작업)의 상태를 반환
+    current = job_manager.current() or {}
+    extra = current.get("extra", {})
+    message = current.get("message", "")
+    if current.get("state") == FAILED:
+        message = f"오류: {current.get('error')}"
     resp = jsonify(
         {
-            "is_running": scraping_status["is_running"],
-            "progress": scraping_status["progress"],
-            "total": scraping_status["total"],
-            "current_category": scraping_status["current_category"],
-            "data_count": len(scraping_status["data"]),
+            "is_running": job_manager.is_busy(),
+            "job_id": current.get("id"),
+            "job_type": current.get("type"),
+            "state": current.get("state"),
+            "progress": current.get("progress", 0),
+            "total": current.get("total", 0),
+            "current_category": message,
+            "data_count": state_store.row_count(),
+            "cache_hits": extra.get("cache_hits", 0),
+            "cache_misses": extra.get("cache_misses", 0),
+            "http": http_client.stats(),
+            "api_endpoints": endpoint_status(get_key_pool()),
         }
     )
     resp.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
     return resp
 
 
+def parse_results_query(args):
+    """결과 조회 조건을 읽습니다 (잘못된 값이면 ValueError).
+
+    - offset, limit: 페이지 (limit 생략 시 끝까지)
+    - fields: 쉼표로 구분한 반환 필드 (생략 시 전체)
+    - category(=법령명), 법령명, 구분, 담당부서: 쉼표로 구분한 값 중 하나와 일치하는 행만
+    - 시행일_from, 시행일_to, 개정일_from, 개정일_to: 날짜 범위 (YYYY-MM-DD, 경계 포함)
+    - sort: 시행일 또는 개정일 (내림차순은 -시행일)
+    """
+    offset = args.get("offset", "0")
+    limit = args.get("limit", "")
+    if not offset.isdigit() or (limit and not limit.isdigit()):
+        raise ValueError("offset, limit은 0 이상의 정수여야 합니다.")
+    equals = {}
+    for param, column in RESULT_FILTERS.items():
+        values = [v for v in args.get(param, "").split(",") if v]
+        if values:
+            equals.setdefault(column, set()).update(values)
+    ranges = {}
+    for field in DATE_FIELDS:
+        bounds = []
+        for suffix in ("_from", "_to"):
+            raw = args.get(field + suffix, "")
+            value = parse_date(raw) if raw else None
+            if raw and not value:
+                raise ValueError(f"{field + suffix} 날짜 형식이 올바르지 않습니다: {raw}")
+            bounds.append(value)
+        if any(bounds):
+            ranges[field] = tuple(bounds)
+    sort = args.get("sort", "")
+    if sort and sort.lstrip("-") not in DATE_FIELDS:
+        raise ValueError(f"sort는 {', '.join(DATE_FIELDS)} 중 하나여야 합니다.")
+    return {
+        "offset": int(offset),
+        "limit": int(limit) if limit else None,
+        "fields": [f for f in args.get("fields", "").split(",") if f],
+        "equals": equals,
+        "ranges": ranges,
+        "sort": sort,
+    }
+
+
+def is_plain_query(query):
+    return not (
+        query["offset"]
+        or query["limit"] is not None
+        or query["fields"]
+        or query["equals"]
+        or query["ranges"]
+        or query["sort"]
+    )
+
+
+def query_rows(index, query):
+    """색인으로 조건을 적용합니다. 반환값: (조건에 맞는 전체 건수, 페이지 행 목록)"""
+    matched = index.query(query["equals"], query["ranges"], query["sort"])
+    offset, limit = query["offset"], query["limit"]
+    page = [index.rows[i] for i in matched[offset : offset + limit if limit is not None else None]]
+    if query["fields"]:
+        page = [{f: row[f] for f in query["fields"] if f in row} for row in page]
+    return len(matched), page
+
+
+def request_etag(prefix, version):
+    """데이터 버전과 조회 조건이 같으면 같은 ETag"""
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.args.items()))
+    return f"{prefix}{version}-{zlib.crc32(query.encode('utf-8')):08x}"
+
+
 @app.route("/api/scrape/results")
 def get_results():
-    resp = jsonify(scraping_status["data"])
-    resp.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
-    resp.headers["Pragma"] = "no-cache"
-    resp.headers["Expires"] = "0"
-    return resp
+    try:
+        query = parse_results_query(request.args)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    # ETag·헤더·본문은 같은 버전의 결과로 만들고, 조회는 304가 아닐 때만 실행
+    if is_plain_query(query):
+        # 조건이 없으면 직렬화 캐시를 그대로 사용
+        version, rows, body = load_results()
+        build_body = lambda: (body, {"X-Total-Count": str(len(rows))})
+    else:
+        index = get_law_index()
+        version = index.version
+
+        def build_body():
+            total, page = query_rows(index, query)
+            return app.json.dumps(page), {"X-Total-Count": str(total)}
+
+    return results_responder.respond(
+        request_etag("v", version),
+        build_body,
+        # 진행 이벤트 스트림(since)에서 이 버전 이후의 변경 행만 받을 수 있도록 전달
+        {"X-Data-Version": str(version)},
+    )
+
+
+@app.route("/api/laws/query")
+def query_laws():
+    """수집된 법령을 담당부서·구분·법령명 일치 조건과 시행일·개정일 범위로 조회합니다.
+
+    예: /api/laws/query?구분=고시&담당부서=기업집단정책과&시행일_from=2025-01-01
+    """
+    try:
+        query = parse_results_query(request.args)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    index = get_law_index()
+
+    def build_body():
+        # 304·캐시 적중이면 호출되지 않으므로 조회 시간은 본문을 만든 요청의 값
+        started = time.perf_counter()
+        total, page = query_rows(index, query)
+        took_ms = (time.perf_counter() - started) * 1000
+        result = {
+            "version": index.version,
+            "total": total,
+            "offset": query["offset"],
+            "items": page,
+        }
+        return app.json.dumps(result), {"X-Query-Time-Ms": f"{took_ms:.3f}"}
+
+    return law_query_responder.respond(
+        request_etag("q", index.version),
+        build_body,
+        {"X-Data-Version": str(index.version)},
+    )
 
 
 @app.route("/api/export/excel", methods=["POST"])
 def export_excel():
-    if not scraping_status["data"]:
+    _, rows, _ = load_results()
+    if not rows:
         return jsonify({"status": "error", "message": "저장할 데이터가 없습니다."})
 
-    df = pd.DataFrame(scraping_status["data"])
+    df = pd.DataFrame(rows)
     cols = [
         "법령명",
         "구분",
@@ -410,27 +901,31 @@ def download_file(filename):
 
 @app.route("/api/pdf/save", methods=["POST"])
 def save_pdf():
-    if not scraping_status["data"]:
+    if not state_store.row_count():
         return jsonify({"status": "error", "message": "저장할 데이터가 없습니다."})
 
-    if scraping_status["is_running"]:
-        return jsonify(
-            {"status": "error", "message": "현재 다른 작업이 진행 중입니다."}
-        )
-
-    scraping_status["is_running"] = True
-    scraping_status["progress"] = 0
-    scraping_status["total"] = len(scraping_status["data"])
-
-    thread = threading.Thread(target=run_pdf_save_task)
-    thread.start()
-
-    return jsonify({"status": "success", "message": "PDF 저장을 시작합니다."})
+    # items: 저장할 결과 행 번호 목록 (생략 시 전체)
+    options = request.get_json(silent=True) or {}
+    try:
+        items = parse_items(options.get("items"))
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    params = {"items": items} if items is not None else {}
+    job, error = job_manager.submit(
+        "pdf", run_pdf_save_task, params, items_lane(items), profile_option(options)
+    )
+    return job_response(job, error, "PDF 저장을 시작합니다.")
 
 
 @app.route("/api/pdf/download")
 def download_pdf_zip():
-    zip_path = scraping_status.get("pdf_zip_path")
+    # job_id: 일부 항목만 저장한 작업의 압축 파일 (생략 시 마지막 전체 저장)
+    job_id = request.args.get("job_id")
+    if job_id:
+        job = job_manager.get(job_id)
+        zip_path = job["extra"].get("zip_path") if job else None
+    else:
+        zip_path = state_store.get_value("pdf_zip_path")
     if not zip_path or not os.path.exists(zip_path):
         return jsonify(
             {"status": "error", "message": "다운로드할 PDF 파일이 없습니다."}
@@ -440,59 +935,119 @@ def download_pdf_zip():
 
 @app.route("/api/pdf/status")
 def get_pdf_status():
-    return jsonify(
-        {
-            "has_zip": bool(
-                scraping_status.get("pdf_zip_path")
-                and os.path.exists(scraping_status.get("pdf_zip_path", ""))
-            )
-        }
-    )
+    zip_path = state_store.get_value("pdf_zip_path")
+    return jsonify({"has_zip": bool(zip_path and os.path.exists(zip_path))})
+
 
+def run_pdf_save_task(job, items=None):
+    """PDF 렌더링 항목을 대기열에 넣고 모두 처리될 때까지 기다린 뒤 압축합니다.
 
-def run_pdf_save_task():
-    global scraping_status
+    PDF_RENDER_MODE=local이면 이 스레드도 작업자로 대기열을 처리하고,
+    queue이면 worker.py 작업자 프로세스가 처리한 결과만 모읍니다.
+    items를 지정하면 해당 행만 저장하고, 압축 파일은 작업 기록(extra.zip_path)에만 남깁니다.
+    """
     import shutil
-    from playwright.sync_api import sync_playwright
 
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    # 이어서 실행할 때는 같은 폴더에 저장하고, 이미 저장한 항목은 건너뜀
+    # (일부 항목 작업은 전체 저장과 같은 시각에 시작해도 폴더가 겹치지 않도록 작업 ID 포함)
+    ts = job.extra.get("ts") or datetime.now().strftime("%Y%m%d_%H%M%S")
+    if items is not None and not job.extra.get("ts"):
+        ts = f"{ts}_{job.id}"
     pdf_dir = os.path.join(OUTPUT_DIR, ts)
     os.makedirs(pdf_dir, exist_ok=True)
+    run_id = job.extra.get("run_id")
+    if run_id and run_id != state_store.active_run():
+        raise RuntimeError("수집 결과가 바뀌어 이어서 실행할 수 없습니다.")
+    job.set_extra(ts=ts, run_id=state_store.active_run(), failed_items=0)
+
+    _, data_list, _ = load_results()
+    targets = range(len(data_list)) if items is None else [i for i in items if 0 <= i < len(data_list)]
+    done_items = job.completed_items()
+    tasks = []
+    skipped = []
+    for i in targets:
+        if str(i) in done_items:
+            continue
+        item = data_list[i]
+        url = item.get("팝업페이지링크")
+        if url and url.startswith("http"):
+            name = safe_filename(item.get("법령명_상세", f"law_{i}"))
+            # 작업자 호스트마다 output 위치가 다를 수 있으므로 output 기준 상대 경로로 전달
+            # (본문 추출 방식의 머리글에 쓰는 법령 정보 포함)
+            meta = {field: item.get(field, "") for field in PDF_HEADER_FIELDS}
+            tasks.append((i, url, os.path.join(ts, f"{name}.pdf"), meta))
+        else:
+            skipped.append((i, "done", 0, None, None))
+    job.checkpoint_many(skipped)
+    # interactive 작업의 항목은 대기열에서 bulk 작업 항목보다 먼저 임대됨
+    state_store.enqueue_render_tasks(job.id, tasks, 1 if job.lane == INTERACTIVE else 0)
+    job.update(
+        total=len(targets),
+        progress=len(targets) - len(tasks),
+        message="PDF 저장 중..." if PDF_RENDER_MODE == "local" else "PDF 렌더링 작업자 처리 대기 중...",
+    )
+
+    def remaining():
+        """남은 항목 수 (대기·임대 중), 진행률과 실패 건수도 함께 갱신"""
+        counts = state_store.render_task_counts(job.id)
+        left = counts.get("pending", 0) + counts.get("leased", 0)
+        job.update(progress=len(targets) - left)
+        if counts.get("failed", 0) != job.extra["failed_items"]:
+            job.set_extra(failed_items=counts.get("failed", 0))
+        return left
+
+    def should_stop():
+        # bulk 작업은 같은 종류의 interactive 작업이 끝날 때까지 다음 항목을 가져가지 않음
+        job.yield_to_interactive()
+        remaining()
+        return job.cancel_requested
 
     try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            context = browser.new_context()
-
-            for i, item in enumerate(scraping_status["data"]):
-                url = item.get("팝업페이지링크")
-                if url and url.startswith("http"):
-                    name = item.get("법령명_상세", f"law_{i}")
-                    safe_name = "".join(
-                        [c for c in name if c.isalnum() or c in (" ", "_")]
-                    ).strip()
-                    pdf_path = os.path.join(pdf_dir, f"{safe_name}.pdf")
-
-                    try:
-                        page = context.new_page()
-                        page.goto(url, wait_until="networkidle", timeout=60000)
-                        page.pdf(path=pdf_path)
-                        page.close()
-                    except:
-                        pass
-                scraping_status["progress"] = i + 1
-
-            browser.close()
-
-            zip_path = os.path.join(OUTPUT_DIR, f"FTC_Laws_PDF_{ts}")
-            shutil.make_archive(zip_path, "zip", pdf_dir)
-            scraping_status["pdf_zip_path"] = zip_path + ".zip"
-
-    except Exception as e:
-        print(f"PDF save error: {e}")
-    finally:
-        scraping_status["is_running"] = False
-        scraping_status["current_category"] = "PDF 저장 완료"
+        if PDF_RENDER_MODE == "local":
+            run_worker(
+                state_store,
+                OUTPUT_DIR,
+                job_id=job.id,
+                stop=should_stop,
+                idle=lambda: remaining() == 0,
+                attempts=JOB_ITEM_ATTEMPTS,
+                backoff=JOB_RETRY_BACKOFF,
+                lease_seconds=RENDER_LEASE_SECONDS,
+                concurrency=PDF_RENDER_CONCURRENCY,
+                page_timeout=PDF_PAGE_TIMEOUT * 1000,
+                stale_after=job_manager.stale_after,
+            )
+        # 다른 작업자가 임대 중인 항목이 끝날 때까지 대기
+        while remaining():
+            job.sleep(POLL_INTERVAL)
+        job.check_cancelled()
+    except JobCancelled:
+        state_store.cancel_render_tasks(job.id)
+        raise
+
+    zip_path = os.path.join(OUTPUT_DIR, f"FTC_Laws_PDF_{ts}")
+    with job.span("zip"):
+        shutil.make_archive(zip_path, "zip", pdf_dir)
+    # 실패 항목이 있어도 저장한 PDF는 작업 기록의 압축 파일로 내려받을 수 있음
+    job.set_extra(zip_path=zip_path + ".zip")
+    failed = state_store.job_items(job.id, state="failed")
+    if failed:
+        # 실패 항목은 작업 기록에 failed로 남아 이어서 실행할 때 다시 렌더링
+        names = [
+            data_list[int(key)].get("법령명_상세", key) for key in sorted(failed, key=int)
+        ]
+        raise RuntimeError(failed_items_error("PDF", names))
+    if items is None:
+        state_store.set_value("pdf_zip_path", zip_path + ".zip")
+    job.update(message="PDF 저장 완료")
+
+
+# 작업 종류별 실행 함수 (이어서 실행할 때 사용)
+JOB_TASKS = {
+    "scrape": run_scraping_task,
+    "info": run_info_update_task,
+    "pdf": run_pdf_save_task,
+}
 
 
 if __name__ == "__main__":
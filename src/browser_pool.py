@@ -0,0 +1,256 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# 선택 사항: 설치되어 있으면 브라우저 메모리 측정에 사용 (없으면 Linux /proc에서 측정)
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+import metrics
+
+# 브라우저 하나가 렌더링한 페이지가 이 수를 넘으면 새 브라우저로 교체
+DEFAULT_MAX_PAGES = 500
+# 브라우저 프로세스(Playwright 드라이버 포함) 전체 RSS가 이 크기(MB)를 넘으면 새 브라우저로 교체
+DEFAULT_MAX_RSS_MB = 1024
+# RSS를 다시 측정하는 최소 간격(초)
+RSS_CHECK_INTERVAL = 10
+# 풀 이벤트 루프에서 저장소 호출 등을 실행하는 스레드 수 (여러 작업이 공유)
+IO_THREADS = 32
+
+BROWSER_LAUNCHES = metrics.counter(
+    "ftc_browser_launches_total", "공유 브라우저 실행 횟수 (start, pages, rss, crash)", ("reason",)
+)
+BROWSER_CONTEXTS = metrics.counter("ftc_browser_contexts_total", "공유 브라우저에서 연 컨텍스트 수")
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _children_rss():
+    """이 프로세스의 하위 프로세스(Playwright 드라이버·Chromium) RSS 합계(바이트), 측정할 수 없으면 None"""
+    if psutil is not None:
+        total = 0
+        for child in psutil.Process().children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except psutil.Error:
+                pass
+        return total
+    if not os.path.isdir("/proc"):
+        return None
+    parents = {}
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/stat") as f:
+                # 'pid (comm) state ppid ...': comm에 공백·괄호가 있을 수 있어 마지막 ')' 뒤에서 해석
+                ppid = int(f.read().rpartition(")")[2].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        parents.setdefault(ppid, []).append(int(name))
+    total = 0
+    pending = list(parents.get(os.getpid(), []))
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    while pending:
+        pid = pending.pop()
+        pending.extend(parents.get(pid, []))
+        try:
+            with open(f"/proc/{pid}/statm") as f:
+                total += int(f.read().split()[1]) * page_size
+        except (OSError, ValueError, IndexError):
+            pass
+    return total
+
+
+class _Browser:
+    """풀이 실행한 브라우저 하나와 사용 현황"""
+
+    def __init__(self, browser):
+        self.browser = browser
+        self.pages = 0
+        self.leases = 0
+        self.retiring = None  # 교체 사유 (교체 대상이 아니면 None)
+
+    @property
+    def healthy(self):
+        return self.retiring is None and self.browser.is_connected()
+
+
+class BrowserLease:
+    """풀에서 받은 격리된 브라우저 컨텍스트 (쿠키·저장소를 다른 작업과 공유하지 않음)"""
+
+    def __init__(self, slot, context):
+        self._slot = slot
+        self.context = context
+        self.in_flight = 0
+
+    @property
+    def usable(self):
+        """False면 브라우저가 종료됐거나 교체 대상이므로 새 컨텍스트를 받아야 함"""
+        return self._slot.healthy
+
+
+class BrowserPool:
+    """프로세스 안에서 오래 유지하는 Chromium과 전용 이벤트 루프 스레드
+
+    - 처음 acquire()할 때 브라우저를 한 번 실행하고, 작업마다 새 컨텍스트를 내어 줌
+    - 컨텍스트를 내어 줄 때 브라우저 연결을 확인하고, 종료된 브라우저는 다시 실행
+    - 렌더링한 페이지 수(BROWSER_MAX_PAGES)나 RSS(BROWSER_MAX_RSS_MB)가 기준을 넘으면
+      이후 요청은 새 브라우저에서 처리하고, 이전 브라우저는 컨텍스트가 모두 반납되면 종료
+
+    Playwright 객체는 만든 이벤트 루프에서만 쓸 수 있으므로 브라우저를 쓰는 코루틴은
+    run()으로 풀의 이벤트 루프에서 실행합니다.
+    """
+
+    def __init__(self, max_pages=None, max_rss_mb=None):
+        if max_pages is None:
+            max_pages = int(os.environ.get("BROWSER_MAX_PAGES", str(DEFAULT_MAX_PAGES)))
+        if max_rss_mb is None:
+            max_rss_mb = float(os.environ.get("BROWSER_MAX_RSS_MB", str(DEFAULT_MAX_RSS_MB)))
+        self.max_pages = max_pages
+        self.max_rss = max_rss_mb * 1024 * 1024
+        self._loop = None
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self._playwright = None
+        self._current = None
+        self._retired = []
+        self._next_reason = "start"
+        self._launch_lock = None
+        self._last_rss_check = 0.0
+
+    def run(self, coro):
+        """코루틴을 풀의 이벤트 루프에서 실행하고 결과를 기다립니다 (어느 스레드에서든 호출 가능)."""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop()).result()
+
+    def _ensure_loop(self):
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._loop = asyncio.new_event_loop()
+                # 작업 스레드에서 호출하는 저장소·콜백이 기본 실행기(CPU 수 기준)를 다 쓰지 않도록 넉넉하게
+                self._loop.set_default_executor(
+                    ThreadPoolExecutor(IO_THREADS, thread_name_prefix="browser-pool-io")
+                )
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name="browser-pool", daemon=True
+                )
+                self._thread.start()
+            return self._loop
+
+    async def acquire(self, **context_options):
+        """새 컨텍스트를 받습니다 (context_options: browser.new_context 인자)."""
+        if self._launch_lock is None:
+            # 풀의 이벤트 루프에서만 실행되므로 여기서 만들어도 경쟁이 없음
+            self._launch_lock = asyncio.Lock()
+        async with self._launch_lock:
+            slot = await self._healthy_browser()
+            try:
+                context = await slot.browser.new_context(**context_options)
+            except Exception:
+                if slot.browser.is_connected():
+                    raise
+                # 확인 직후 종료된 경우 한 번만 다시 실행
+                slot = await self._healthy_browser()
+                context = await slot.browser.new_context(**context_options)
+            slot.leases += 1
+        BROWSER_CONTEXTS.inc()
+        return BrowserLease(slot, context)
+
+    async def release(self, lease):
+        try:
+            await lease.context.close()
+        except Exception:
+            pass  # 브라우저가 이미 종료된 경우
+        lease._slot.leases -= 1
+        await self._close_retired()
+
+    async def page_done(self, lease):
+        """페이지 하나를 닫은 뒤 호출: 교체 기준을 넘은 브라우저를 교체 대상으로 표시"""
+        slot = lease._slot
+        slot.pages += 1
+        if slot.retiring is not None or slot is not self._current:
+            return
+        if slot.pages >= self.max_pages:
+            self._retire(slot, "pages")
+            return
+        now = time.monotonic()
+        if self.max_rss > 0 and now - self._last_rss_check >= RSS_CHECK_INTERVAL:
+            self._last_rss_check = now
+            rss = await asyncio.to_thread(_children_rss)
+            if rss is not None and rss > self.max_rss:
+                self._retire(slot, "rss")
+
+    async def _healthy_browser(self):
+        slot = self._current
+        if slot is not None and slot.healthy:
+            return slot
+        if self._playwright is None:
+            from playwright.async_api import async_playwright
+
+            self._playwright = await async_playwright().start()
+        if slot is not None:
+            # 교체 대상은 _current에서 빠지므로 여기 남은 브라우저는 연결이 끊긴 경우
+            self._retire(slot, "crash")
+            await self._close_retired()
+        reason = self._next_reason
+        browser = await self._playwright.chromium.launch(headless=True)
+        BROWSER_LAUNCHES.inc(reason=reason)
+        if reason != "start":
+            print(f"브라우저를 새로 실행했습니다 (사유: {reason})")
+        self._current = _Browser(browser)
+        return self._current
+
+    def _retire(self, slot, reason):
+        slot.retiring = reason
+        self._retired.append(slot)
+        if slot is self._current:
+            self._current = None
+            self._next_reason = reason
+
+    async def _close_retired(self):
+        """교체 대상 브라우저 중 컨텍스트가 모두 반납된 브라우저를 종료합니다."""
+        for slot in [s for s in self._retired if s.leases <= 0]:
+            self._retired.remove(slot)
+            try:
+                await slot.browser.close()
+            except Exception as e:
+                print(f"WARNING: 브라우저 종료 실패: {e}")
+
+    async def _shutdown(self):
+        for slot in self._retired + ([self._current] if self._current else []):
+            try:
+                await slot.browser.close()
+            except Exception:
+                pass
+        self._retired = []
+        self._current = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    def close(self):
+        """브라우저와 이벤트 루프 스레드를 종료합니다 (프로세스 종료 시)."""
+        with self._thread_lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if thread is None or not thread.is_alive():
+            return
+        asyncio.run_coroutine_threadsafe(self._shutdown(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        self._launch_lock = None
+        self._next_reason = "start"
+
+
+def get_browser_pool():
+    """프로세스 공용 브라우저 풀 (gunicorn 작업자는 fork 이후 각자 생성)"""
+    pid = os.getpid()
+    with _pools_lock:
+        if pid not in _pools:
+            _pools[pid] = BrowserPool()
+        return _pools[pid]
@@ -0,0 +1,81 @@
+import threading
+import time
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """연속 실패 시 엔드포인트 호출을 차단하고, 대기 시간 후 한 번의 시험 호출을 허용합니다.
+
+    - closed: 정상 호출. 연속 실패가 threshold에 도달하면 open
+    - open: 호출 차단. cooldown(초)이 지나면 half_open
+    - half_open: 시험 호출 1건만 허용. 성공하면 closed, 실패하면 다시 open
+    """
+
+    def __init__(self, name, threshold=3, cooldown=30.0):
+        self.name = name
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.total_failures = 0
+        self.total_successes = 0
+        self.opened_at = None
+        self.last_error = ""
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """지금 호출해도 되는지 확인합니다 (half_open 시험 호출 예약 포함)."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.cooldown:
+                    return False
+                self.state = HALF_OPEN
+                print(f"INFO: Circuit {self.name} half-open, probing...")
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.total_successes += 1
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+            if self.state != CLOSED:
+                print(f"INFO: Circuit {self.name} closed")
+            self.state = CLOSED
+            self.opened_at = None
+
+    def record_failure(self, reason=""):
+        with self._lock:
+            self.total_failures += 1
+            self.consecutive_failures += 1
+            self.last_error = reason
+            self._probe_in_flight = False
+            if self.state == HALF_OPEN or (
+                self.state == CLOSED and self.consecutive_failures >= self.threshold
+            ):
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+                print(f"WARNING: Circuit {self.name} opened ({reason})")
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "total_failures": self.total_failures,
+                "total_successes": self.total_successes,
+                "last_error": self.last_error,
+                "retry_in": round(
+                    max(0.0, self.cooldown - (time.monotonic() - self.opened_at)), 1
+                )
+                if self.state == OPEN
+                else 0.0,
+            }
@@ -1,15 +1,17 @@
 import pandas as pd
-import requests
 from bs4 import BeautifulSoup
 import time
 import os
 import re
 from urllib.parse import urlparse
 import random
+import http_client
+from browser_pool import get_browser_pool
+from pdf_render import PdfRenderer
 
 # PDF 변환을 위한 라이브러리 (playwright 사용)
 try:
-    from playwright.sync_api import sync_playwright
+    import playwright
     HAS_PLAYWRIGHT = True
 except ImportError:
     HAS_PLAYWRIGHT = False
@@ -54,7 +56,7 @@ def fetch_page_content(url, session=None):
         if session:
             response = session.get(url, headers=headers, timeout=15)
         else:
-            response = requests.get(url, headers=headers, timeout=15)
+            response = http_client.get(url, headers=headers, timeout=15)
         response.raise_for_status()
         
         # 인코딩 처리
@@ -68,8 +70,8 @@ def fetch_page_content(url, session=None):
         print(f"  ERROR: 페이지 가져오기 실패 ({url}): {e}")
         return None
 
-def save_page_as_pdf(url, output_path, playwright_context=None):
-    """웹페이지를 PDF로 저장합니다 (playwright 사용)."""
+def save_page_as_pdf(url, output_path, renderer=None):
+    """웹페이지를 PDF로 저장합니다 (공유 브라우저 풀의 PdfRenderer 사용)."""
     print(f"  처리 중: {url}")
     
     try:
@@ -77,30 +79,12 @@ def save_page_as_pdf(url, output_path, playwright_context=None):
             print("  ERROR: playwright가 설치되지 않았습니다.")
             return False
         
-        if playwright_context is None:
-            print("  ERROR: playwright context가 제공되지 않았습니다.")
+        if renderer is None:
+            print("  ERROR: PDF renderer가 제공되지 않았습니다.")
             return False
         
-        # 페이지 열기
-        page = playwright_context.new_page()
-        
-        # 페이지 로드 (타임아웃 30초)
-        page.goto(url, wait_until='networkidle', timeout=30000)
-        
-        # PDF로 저장
-        page.pdf(
-            path=output_path,
-            format='A4',
-            print_background=True,
-            margin={
-                'top': '1cm',
-                'right': '1cm',
-                'bottom': '1cm',
-                'left': '1cm'
-            }
-        )
-        
-        page.close()
+        # 페이지 로드·PDF 저장 (타임아웃 30초, 렌더링 방식은 PDF_RENDER_PROFILE)
+        renderer.pool.run(renderer.render(url, output_path))
         
         # 파일 크기 확인
         if os.path.exists(output_path):
@@ -148,14 +132,23 @@ def process_excel_to_pdf():
         os.makedirs(OUTPUT_DIR)
         print(f"출력 디렉토리 생성: {OUTPUT_DIR}")
     
-    # playwright 브라우저 시작
+    # 공유 브라우저 풀에서 컨텍스트 받기 (브라우저는 풀이 실행·교체)
     print("\n브라우저를 시작하는 중...")
-    playwright_instance = sync_playwright().start()
-    browser = playwright_instance.chromium.launch(headless=True)
-    context = browser.new_context(
-        viewport={'width': 1920, 'height': 1080},
-        user_agent=random.choice(USER_AGENTS)
+    pool = get_browser_pool()
+    renderer = PdfRenderer(
+        pool,
+        timeout=30000,
+        context_options={
+            'viewport': {'width': 1920, 'height': 1080},
+            'user_agent': random.choice(USER_AGENTS),
+        },
+        pdf_options={
+            'format': 'A4',
+            'print_background': True,
+            'margin': {'top': '1cm', 'right': '1cm', 'bottom': '1cm', 'left': '1cm'},
+        },
     )
+    pool.run(renderer.start())
     
     # 각 행 처리
     total = len(df)
@@ -190,7 +183,7 @@ def process_excel_to_pdf():
             print(f"[{idx+1}/{total}] {law_name}")
             
             # PDF 저장
-            if save_page_as_pdf(link, pdf_path, context):
+            if save_page_as_pdf(link, pdf_path, renderer):
                 success_count += 1
             else:
                 fail_count += 1
@@ -201,9 +194,8 @@ def process_excel_to_pdf():
     finally:
         # 브라우저 종료
         print("\n브라우저를 종료하는 중...")
-        context.close()
-        browser.close()
-        playwright_instance.stop()
+        pool.run(renderer.close())
+        pool.close()
     
     # 결과 요약
     print("\n" + "="*50)
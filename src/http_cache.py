@@ -0,0 +1,220 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# --- Constants ---
+DEFAULT_CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "output", "http_cache"
+)
+INDEX_DB = "index.sqlite3"
+# 이전 버전의 JSON 색인 (처음 열 때 SQLite 색인으로 옮긴 뒤 삭제)
+LEGACY_INDEX_FILE = "index.json"
+# 조회 시 마지막 사용 시각(LRU 기준)을 다시 기록하는 최소 간격(초)
+ACCESS_UPDATE_INTERVAL = 60
+
+META_COLUMNS = ["url", "etag", "last_modified", "content_hash", "stored_at", "last_access", "size"]
+
+
+def content_hash(body):
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+
+class HttpCache:
+    """URL 단위 디스크 캐시 (본문, ETag/Last-Modified, 본문 해시, 파싱 결과)
+
+    - TTL 이내의 항목은 요청 없이 그대로 사용하고, 이후에는 조건부 GET으로 재검증합니다.
+    - 전체 크기가 max_bytes를 넘으면 가장 오래 사용하지 않은 항목부터 삭제합니다 (LRU).
+    - 색인은 SQLite(index.sqlite3)에 항목 단위로 기록하므로 같은 캐시 폴더를 쓰는
+      여러 프로세스(gunicorn 작업자, worker.py)가 서로의 항목을 덮어쓰지 않습니다.
+    """
+
+    def __init__(self, directory, ttl=600, max_bytes=50 * 1024 * 1024):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(
+            os.path.join(directory, INDEX_DB), timeout=30, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                url TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                content_hash TEXT,
+                stored_at REAL,
+                last_access REAL,
+                size INTEGER
+            )
+            """
+        )
+        self._conn.commit()
+        self._import_legacy_index()
+
+    # --- 색인 관리 ---
+    def _import_legacy_index(self):
+        path = os.path.join(self.directory, LEGACY_INDEX_FILE)
+        try:
+            with open(path, encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return
+        with self._lock:
+            self._conn.executemany(
+                f"INSERT OR IGNORE INTO entries (key, {', '.join(META_COLUMNS)})"
+                f" VALUES (?, {', '.join('?' for _ in META_COLUMNS)})",
+                ([key] + [meta.get(c) for c in META_COLUMNS] for key, meta in index.items()),
+            )
+            self._conn.commit()
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _key(url):
+        return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+    def _path(self, key, ext):
+        return os.path.join(self.directory, f"{key}.{ext}")
+
+    def _write(self, key, ext, write):
+        """프로세스·스레드별 임시 파일에 쓴 뒤 교체 (동시에 같은 항목을 써도 파일이 깨지지 않음)"""
+        tmp_path = self._path(key, f"{ext}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            write(f)
+        os.replace(tmp_path, self._path(key, ext))
+
+    def _size(self, key):
+        size = 0
+        for ext in ("html", "json"):
+            try:
+                size += os.path.getsize(self._path(key, ext))
+            except OSError:
+                pass
+        return size
+
+    # --- 조회 ---
+    def get(self, url):
+        """캐시 항목(메타데이터 + rows)을 반환합니다. 없으면 None."""
+        key = self._key(url)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(META_COLUMNS)} FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            entry = dict(zip(META_COLUMNS, row))
+            if now - (entry["last_access"] or 0) >= ACCESS_UPDATE_INTERVAL:
+                self._conn.execute(
+                    "UPDATE entries SET last_access = ? WHERE key = ?", (now, key)
+                )
+                self._conn.commit()
+        try:
+            with open(self._path(key, "json"), encoding="utf-8") as f:
+                rows = json.load(f)
+        except (OSError, ValueError):
+            rows = None
+        entry["rows"] = rows
+        entry["fresh"] = (now - entry["stored_at"]) < self.ttl
+        return entry
+
+    @staticmethod
+    def conditional_headers(entry):
+        """If-None-Match / If-Modified-Since 요청 헤더"""
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    # --- 저장 ---
+    def put(self, url, body, etag=None, last_modified=None, rows=None):
+        key = self._key(url)
+        now = time.time()
+        self._write(key, "html", lambda f: f.write(body))
+        self._write(key, "json", lambda f: json.dump(rows, f, ensure_ascii=False))
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO entries (key, {', '.join(META_COLUMNS)})"
+                f" VALUES (?, {', '.join('?' for _ in META_COLUMNS)})",
+                (key, url, etag, last_modified, content_hash(body), now, now, self._size(key)),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def set_rows(self, url, rows):
+        """본문을 파싱한 결과를 저장합니다 (다음 요청에서 변경이 없으면 그대로 재사용)."""
+        key = self._key(url)
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return
+        self._write(key, "json", lambda f: json.dump(rows, f, ensure_ascii=False))
+        with self._lock:
+            self._conn.execute(
+                "UPDATE entries SET size = ? WHERE key = ?", (self._size(key), key)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def revalidated(self, url, etag=None, last_modified=None):
+        """304 응답 등으로 변경 없음이 확인된 항목의 저장 시각과 검증자를 갱신합니다."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE entries SET stored_at = ?, etag = COALESCE(?, etag),"
+                " last_modified = COALESCE(?, last_modified) WHERE key = ?",
+                (time.time(), etag or None, last_modified or None, self._key(url)),
+            )
+            self._conn.commit()
+
+    def _evict(self):
+        """잠금 안에서 호출 (commit은 호출하는 쪽에서)"""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM entries ORDER BY last_access"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            for ext in ("html", "json"):
+                try:
+                    os.remove(self._path(key, ext))
+                except OSError:
+                    pass
+            total -= size or 0
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+
+_page_caches = {}
+_page_cache_lock = threading.Lock()
+
+
+def get_page_cache():
+    """FTC 페이지 공용 캐시 (FTC_HTTP_CACHE=0 이면 None)
+
+    FTC_HTTP_CACHE_DIR, FTC_HTTP_CACHE_TTL(초), FTC_HTTP_CACHE_MAX_MB 로 설정합니다.
+    gunicorn 작업자는 fork 이후 각자 색인 연결을 열도록 프로세스 ID별로 생성합니다.
+    """
+    if os.environ.get("FTC_HTTP_CACHE", "1") == "0":
+        return None
+    pid = os.getpid()
+    with _page_cache_lock:
+        if pid not in _page_caches:
+            _page_caches[pid] = HttpCache(
+                os.environ.get("FTC_HTTP_CACHE_DIR", DEFAULT_CACHE_DIR),
+                ttl=float(os.environ.get("FTC_HTTP_CACHE_TTL", "600")),
+                max_bytes=int(float(os.environ.get("FTC_HTTP_CACHE_MAX_MB", "50")) * 1024 * 1024),
+            )
+        return _page_caches[pid]
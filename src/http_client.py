@@ -0,0 +1,139 @@
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import metrics
+
+# --- Constants ---
+RETRY_STATUS = (500, 502, 503, 504)
+
+# 설정은 .env 로드 이후 첫 요청 시점에 읽는다
+_session = None
+_host_timeouts = None
+_session_lock = threading.Lock()
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+REQUEST_SECONDS = metrics.histogram(
+    "ftc_http_request_seconds", "공용 HTTP 클라이언트 요청 지연 시간", ("host", "outcome")
+)
+RESPONSE_BYTES = metrics.counter(
+    "ftc_http_response_bytes_total", "공용 HTTP 클라이언트 수신 바이트", ("host",)
+)
+
+
+def _parse_host_timeouts(raw):
+    """'www.law.go.kr=10,apis.data.go.kr=15' 형식의 호스트별 타임아웃 설정 해석"""
+    timeouts = {}
+    for part in raw.split(","):
+        host, _, value = part.partition("=")
+        if host.strip() and value.strip():
+            try:
+                timeouts[host.strip()] = float(value)
+            except ValueError:
+                print(f"WARNING: 잘못된 HTTP_HOST_TIMEOUTS 항목 무시: {part}")
+    return timeouts
+
+
+def _build_session():
+    # 5xx 및 연결 오류 재시도 (지수 백오프: backoff * 2^(n-1) 초)
+    retry_total = int(os.environ.get("HTTP_RETRY_TOTAL", "3"))
+    retry = Retry(
+        total=retry_total,
+        connect=retry_total,
+        read=retry_total,
+        status=retry_total,
+        backoff_factor=float(os.environ.get("HTTP_RETRY_BACKOFF", "0.5")),
+        status_forcelist=RETRY_STATUS,
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        raise_on_status=False,
+    )
+    # 호스트별 커넥션 풀 개수 / 풀당 최대 커넥션 수
+    adapter = HTTPAdapter(
+        pool_connections=int(os.environ.get("HTTP_POOL_CONNECTIONS", "10")),
+        pool_maxsize=int(os.environ.get("HTTP_POOL_MAXSIZE", "16")),
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_session():
+    """프로세스 전체에서 공유하는 requests.Session (호스트별 keep-alive 풀)"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def host_timeout(url):
+    """호스트별 타임아웃 (HTTP_HOST_TIMEOUTS, 없으면 HTTP_TIMEOUT)"""
+    global _host_timeouts
+    if _host_timeouts is None:
+        _host_timeouts = _parse_host_timeouts(os.environ.get("HTTP_HOST_TIMEOUTS", ""))
+    host = urlparse(url).hostname or ""
+    return _host_timeouts.get(host, float(os.environ.get("HTTP_TIMEOUT", "10")))
+
+
+def _record(host, elapsed, nbytes, error=False):
+    with _stats_lock:
+        s = _stats.setdefault(
+            host,
+            {"requests": 0, "errors": 0, "bytes": 0, "latency_total": 0.0, "latency_max": 0.0},
+        )
+        s["requests"] += 1
+        s["bytes"] += nbytes
+        s["latency_total"] += elapsed
+        s["latency_max"] = max(s["latency_max"], elapsed)
+        if error:
+            s["errors"] += 1
+    REQUEST_SECONDS.observe(elapsed, host=host, outcome="error" if error else "ok")
+    if nbytes:
+        RESPONSE_BYTES.inc(nbytes, host=host)
+
+
+def get(url, timeout=None, **kwargs):
+    """공유 세션으로 GET 요청을 보냅니다. timeout 미지정 시 호스트별 기본값을 사용합니다."""
+    host = urlparse(url).hostname or ""
+    if timeout is None:
+        timeout = host_timeout(url)
+    start = time.perf_counter()
+    try:
+        response = get_session().get(url, timeout=timeout, **kwargs)
+    except Exception:
+        _record(host, time.perf_counter() - start, 0, error=True)
+        raise
+    _record(
+        host,
+        time.perf_counter() - start,
+        len(response.content),
+        error=response.status_code >= 400,
+    )
+    return response
+
+
+def stats():
+    """호스트별 요청 수, 오류 수, 수신 바이트, 평균/최대 지연(ms)"""
+    with _stats_lock:
+        result = {}
+        for host, s in _stats.items():
+            result[host] = {
+                "requests": s["requests"],
+                "errors": s["errors"],
+                "bytes": s["bytes"],
+                "latency_avg_ms": round(s["latency_total"] / s["requests"] * 1000, 1)
+                if s["requests"]
+                else 0.0,
+                "latency_max_ms": round(s["latency_max"] * 1000, 1),
+            }
+        return result
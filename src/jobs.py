@@ -0,0 +1,328 @@
+import contextlib
+import os
+import socket
+import threading
+import time
+import traceback
+import uuid
+
+from profiling import JobProfiler
+
+# --- Constants ---
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (COMPLETED, FAILED, CANCELLED)
+
+# 우선순위(lane): 단일 카테고리·단일 법령 같은 작은 요청은 interactive, 전체 작업은 bulk
+INTERACTIVE = "interactive"
+BULK = "bulk"
+LANES = (INTERACTIVE, BULK)
+
+# 작업 종류별 기본 동시 실행 수
+DEFAULT_LIMITS = {"scrape": 1, "info": 1, "pdf": 1}
+# 함께 실행할 수 없는 작업 종류 (수집은 데이터 전체를 교체하므로 다른 작업과 배타적)
+DEFAULT_CONFLICTS = {"scrape": {"info", "pdf"}, "info": {"scrape"}, "pdf": {"scrape"}}
+# interactive 작업의 동시 실행 수 (bulk 작업과 따로 셈)
+INTERACTIVE_LIMITS = {"scrape": 1, "info": 2, "pdf": 2}
+# interactive 작업의 배타 조건: PDF는 시작 시점의 수집 결과로 처리하므로 진행 중인
+# 수집과 함께 실행할 수 있고, 정보 조회는 기록 대상(run)을 수집 완료(finish_run)가
+# 교체하면 조회 결과가 사라지므로 수집과 서로 배타적 (어느 쪽이 먼저 시작해도 동일)
+INTERACTIVE_CONFLICTS = {"scrape": {"info"}, "info": {"scrape"}, "pdf": set()}
+# 저장소에 보관하는 완료 작업 수
+MAX_FINISHED_JOBS = 50
+# 실행 중인 작업의 heartbeat 갱신 주기(초)와, 응답 없는 작업으로 보는 기준(초)
+HEARTBEAT_INTERVAL = 10
+STALE_AFTER = 60
+# 다른 작업자가 기록한 취소 요청을 확인하는 최소 간격(초)
+CANCEL_POLL_INTERVAL = 1.0
+
+
+class JobCancelled(Exception):
+    """작업 취소 요청으로 중단된 경우"""
+
+
+def retry_with_backoff(job, func, attempts=3, backoff=1.0):
+    """func()를 실패 시 backoff, backoff*2, ...초 간격으로 최대 attempts회 실행합니다.
+
+    대기 중 취소 요청이 있으면 JobCancelled를 발생시킵니다.
+    반환값: (결과, 시도 횟수, 마지막 예외 또는 None)
+    """
+    last_error = None
+    for attempt in range(1, attempts + 1):
+        try:
+            return func(), attempt, None
+        except JobCancelled:
+            raise
+        except Exception as e:
+            last_error = e
+            if attempt < attempts:
+                job.sleep(backoff * 2 ** (attempt - 1))
+    return None, attempts, last_error
+
+
+class Job:
+    """실행 중인 작업 하나 (작업을 실행하는 프로세스에만 존재)
+
+    상태 변경은 잠금 안에서 이루어지고 공유 저장소에 바로 기록됩니다.
+    """
+
+    def __init__(self, job_id, job_type, params, store, lane=BULK, stale_after=STALE_AFTER):
+        self.id = job_id
+        self.type = job_type
+        self.lane = lane
+        self.params = params
+        self.state = QUEUED
+        self.progress = 0
+        self.total = 0
+        self.message = ""
+        self.error = None
+        self.extra = {}
+        self.started_at = None
+        self.finished_at = None
+        self.resumed = False
+        self.profiler = None
+        self._store = store
+        self._lock = threading.Lock()
+        self._cancel_event = threading.Event()
+        self._last_cancel_poll = 0.0
+        self._stale_after = stale_after
+        self._last_priority_poll = 0.0
+        self._interactive_active = False
+
+    def update(self, **fields):
+        """progress, total, message 등 필드를 갱신합니다."""
+        with self._lock:
+            for name, value in fields.items():
+                setattr(self, name, value)
+            self._store.update_job(self.id, **fields)
+
+    def set_extra(self, **fields):
+        with self._lock:
+            self.extra.update(fields)
+            self._store.update_job(self.id, extra=self.extra)
+
+    def incr_extra(self, name, amount=1):
+        with self._lock:
+            self.extra[name] = self.extra.get(name, 0) + amount
+            self._store.update_job(self.id, extra=self.extra)
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    @property
+    def cancel_requested(self):
+        """이 프로세스 또는 다른 작업자가 취소를 요청했는지 확인합니다."""
+        if not self._cancel_event.is_set():
+            now = time.monotonic()
+            if now - self._last_cancel_poll >= CANCEL_POLL_INTERVAL:
+                self._last_cancel_poll = now
+                if self._store.cancel_requested(self.id):
+                    self._cancel_event.set()
+        return self._cancel_event.is_set()
+
+    def check_cancelled(self):
+        """취소 요청이 있으면 JobCancelled를 발생시킵니다 (항목 사이에서 호출)."""
+        if self.cancel_requested:
+            raise JobCancelled()
+
+    def sleep(self, seconds):
+        """취소 요청을 확인하면서 대기합니다."""
+        deadline = time.monotonic() + seconds
+        while True:
+            self.check_cancelled()
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            self._cancel_event.wait(min(remaining, CANCEL_POLL_INTERVAL))
+
+    def span(self, stage, item=None):
+        """프로파일링 중이면 단계(stage)·항목(item) 구간의 소요 시간을 기록합니다.
+
+        구간 안에서 호출한 profiling.span()도 이 작업의 구간으로 기록됩니다.
+        """
+        if self.profiler is None:
+            return contextlib.nullcontext()
+        return self.profiler.span(stage, item)
+
+    def yield_to_interactive(self):
+        """bulk 작업은 같은 종류의 interactive 작업이 진행 중이면 끝날 때까지 대기합니다.
+
+        항목 사이에서 호출하며, 대기 중 취소 요청이 있으면 JobCancelled를 발생시킵니다.
+        """
+        if self.lane != BULK:
+            return
+        announced = False
+        while self._poll_interactive():
+            if not announced:
+                self.update(message="우선 작업 처리 대기 중...")
+                announced = True
+            self.sleep(CANCEL_POLL_INTERVAL)
+
+    def _poll_interactive(self):
+        now = time.monotonic()
+        if now - self._last_priority_poll >= CANCEL_POLL_INTERVAL:
+            self._last_priority_poll = now
+            self._interactive_active = self._store.has_active_jobs(
+                self._stale_after, self.type, INTERACTIVE
+            )
+        return self._interactive_active
+
+    def checkpoint(self, item_key, state="done", attempts=1, error=None, result=None):
+        """항목 처리 결과를 작업 기록에 남깁니다 (이어서 실행할 때 완료 항목은 건너뜀)."""
+        self._store.record_items(self.id, [(item_key, state, attempts, error, result)])
+
+    def checkpoint_many(self, items):
+        """items: [(항목 키, state, 시도 횟수, 오류, 결과)]"""
+        if items:
+            self._store.record_items(self.id, items)
+
+    def completed_items(self):
+        """이전 실행까지 완료된 항목 키 집합"""
+        return set(self._store.job_items(self.id, state="done"))
+
+
+class JobManager:
+    """작업 ID 발급, 작업 종류별 동시 실행 제한, 백그라운드 스레드 실행을 담당합니다.
+
+    작업 상태는 공유 저장소(state_store.StateStore)에 있으므로 어느 작업자
+    프로세스에서든 조회·취소할 수 있고, 실행 제한 확인과 등록이 한 트랜잭션이라
+    같은 작업을 두 작업자가 동시에 시작하지 않습니다.
+    """
+
+    def __init__(
+        self,
+        store,
+        limits=None,
+        conflicts=None,
+        stale_after=STALE_AFTER,
+        interactive_limits=None,
+        interactive_conflicts=None,
+    ):
+        self.store = store
+        self.stale_after = stale_after
+        self.limits = dict(DEFAULT_LIMITS, **(limits or {}))
+        self.conflicts = conflicts if conflicts is not None else DEFAULT_CONFLICTS
+        self.interactive_limits = dict(INTERACTIVE_LIMITS, **(interactive_limits or {}))
+        self.interactive_conflicts = (
+            interactive_conflicts if interactive_conflicts is not None else INTERACTIVE_CONFLICTS
+        )
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._local = {}
+        self._lock = threading.Lock()
+
+    def _rules(self, lane):
+        """우선순위별 (동시 실행 수, 배타 조건)"""
+        if lane == INTERACTIVE:
+            return self.interactive_limits, self.interactive_conflicts
+        return self.limits, self.conflicts
+
+    def submit(self, job_type, func, params=None, lane=BULK, profile=None):
+        """작업을 등록하고 스레드에서 func(job, **params)를 실행합니다.
+
+        lane=INTERACTIVE인 작업은 bulk 작업과 별도의 동시 실행 수를 사용하고,
+        같은 종류의 bulk 작업은 항목 사이에서 양보합니다 (Job.yield_to_interactive).
+        profile: 프로파일링 방식 (profiling.MODES, 이어서 실행할 때도 유지)
+        반환값: (Job, None) 또는 실행할 수 없을 때 (None, 오류 메시지)
+        """
+        params = params or {}
+        job_id = uuid.uuid4().hex[:12]
+        limits, conflicts = self._rules(lane)
+        error = self.store.claim_job(
+            job_id, job_type, lane, params, self.owner, limits, conflicts, self.stale_after
+        )
+        if error:
+            return None, error
+        self.store.trim_jobs(MAX_FINISHED_JOBS)
+        job = Job(job_id, job_type, params, self.store, lane, self.stale_after)
+        if profile:
+            job.set_extra(profile=profile)
+        return self._start(job, func), None
+
+    def resume(self, job_id, func):
+        """실패·취소된 작업을 같은 ID로 다시 실행합니다.
+
+        extra(실행 상태)와 항목 기록이 유지되므로 작업 함수는 완료 항목을 건너뜁니다.
+        반환값: (Job, None) 또는 (None, 오류 메시지)
+        """
+        row = self.store.get_job(job_id)
+        if row is None:
+            return None, "작업을 찾을 수 없습니다."
+        limits, conflicts = self._rules(row["lane"])
+        error = self.store.reclaim_job(job_id, self.owner, limits, conflicts, self.stale_after)
+        if error:
+            return None, error
+        job = Job(
+            job_id, row["type"], row["params"], self.store, row["lane"], self.stale_after
+        )
+        job.extra = row["extra"]
+        job.resumed = True
+        return self._start(job, func), None
+
+    def _start(self, job, func):
+        with self._lock:
+            self._local[job.id] = job
+        thread = threading.Thread(
+            target=self._run, args=(job, func), name=f"job-{job.type}-{job.id}", daemon=True
+        )
+        thread.start()
+        return job
+
+    def _run(self, job, func):
+        stop_heartbeat = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._heartbeat, args=(job.id, stop_heartbeat), daemon=True
+        )
+        job.update(state=RUNNING, started_at=time.time(), finished_at=None)
+        heartbeat.start()
+        if job.extra.get("profile"):
+            job.profiler = JobProfiler(job.id, self.store, job.extra["profile"]).start()
+        try:
+            with job.span("job"):
+                func(job, **job.params)
+            job.update(state=CANCELLED if job.cancel_requested else COMPLETED)
+        except JobCancelled:
+            job.update(state=CANCELLED, message="작업이 취소되었습니다.")
+        except Exception as e:
+            traceback.print_exc()
+            job.update(state=FAILED, error=str(e))
+        finally:
+            stop_heartbeat.set()
+            if job.profiler is not None:
+                job.profiler.stop()
+            job.update(finished_at=time.time())
+            with self._lock:
+                self._local.pop(job.id, None)
+
+    def _heartbeat(self, job_id, stop):
+        while not stop.wait(HEARTBEAT_INTERVAL):
+            self.store.heartbeat(job_id)
+
+    def get(self, job_id):
+        """작업 상태 dict (없으면 None)"""
+        return self.store.get_job(job_id)
+
+    def list(self, job_type=None):
+        return self.store.list_jobs(job_type, limit=MAX_FINISHED_JOBS)
+
+    def cancel(self, job_id):
+        if not self.store.request_cancel(job_id):
+            return False
+        with self._lock:
+            job = self._local.get(job_id)
+        if job is not None:
+            job.cancel()
+        return True
+
+    def is_busy(self):
+        return self.store.has_active_jobs(self.stale_after)
+
+    def current(self):
+        """진행 중인 작업 중 가장 최근 작업, 없으면 가장 최근 작업 (dict)"""
+        jobs = self.list()
+        running = [job for job in jobs if job["state"] not in FINISHED_STATES]
+        if running:
+            return running[0]
+        return jobs[0] if jobs else None
@@ -0,0 +1,488 @@
+import os
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import urlparse
+
+import http_client
+import law_xml
+import metrics
+import profiling
+from api_keys import QUOTA_ERROR_MARKERS
+from circuit_breaker import CircuitBreaker
+from law_index import parse_date
+from rate_limiter import get_limiter
+
+# --- Constants ---
+DATA_GO_KR_URL = "http://apis.data.go.kr/1170000/law/lawSearchList.do"
+LAW_GO_KR_URL = "http://www.law.go.kr/DRF/lawSearch.do"
+ADMRUL_KEYWORDS = ["고시", "지침", "예규", "훈령", "공고"]
+# 오류 응답 문구로 인증 오류를 구분 (예: 인증되지 않은 사용자, SERVICE_KEY_IS_NOT_REGISTERED_ERROR)
+AUTH_ERROR_MARKERS = ["인증", "SERVICE_KEY", "ACCESS DENIED"]
+# 일괄 조회 시 소관부처 코드 (공정거래위원회) 및 페이지 크기 (API 최대 100)
+FTC_ORG_CODE = "1130000"
+BULK_PAGE_SIZE = 100
+
+REQUEST_SECONDS = metrics.histogram(
+    "ftc_law_api_request_seconds",
+    "법령 API 요청 지연 시간 (결과: ok, connection, http, auth, quota, error, parse)",
+    ("endpoint", "outcome"),
+)
+LOOKUPS = metrics.counter(
+    "ftc_law_lookup_total", "법령 시행/개정 정보 조회 (cache, index, api, not_found, error)", ("source",)
+)
+
+# 모든 시도가 실패한 경우 기록할 값
+FAILED_INFO = {
+    "시행/개정": "인증/조회 실패",
+    "시행일": "API 오류 (키 확인)",
+    "개정유형": "-",
+    "개정정보": "-",
+    "개정일": "-",
+    "시행일_date": "",
+    "개정일_date": "",
+}
+
+
+def lookup_target(category_type):
+    """구분값으로 조회 대상(eflaw: 법령, admrul: 행정규칙)을 결정합니다."""
+    if any(x in category_type for x in ADMRUL_KEYWORDS):
+        return "admrul"
+    return "eflaw"
+
+
+def endpoint_configs(is_base64):
+    """시도할 설정들 (공공데이터포털 vs 국가법령정보센터)"""
+    data_go_kr = {"url": DATA_GO_KR_URL, "param": "serviceKey"}
+    law_go_kr = {"url": LAW_GO_KR_URL, "param": "OC"}
+    if is_base64:
+        return [data_go_kr, law_go_kr]
+    return [law_go_kr, data_go_kr]
+
+
+# (엔드포인트, 인증 파라미터, 키)별 차단기와 키별로 마지막에 성공한 엔드포인트
+_breakers = {}
+_breakers_lock = threading.Lock()
+_preferred_urls = {}
+
+
+def endpoint_breaker(cfg, key):
+    """엔드포인트별 차단기 (LAW_API_BREAKER_THRESHOLD회 연속 실패 시 LAW_API_BREAKER_COOLDOWN초 차단)"""
+    name = f"{urlparse(cfg['url']).hostname}:{cfg['param']}:{key.name}"
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                name,
+                threshold=int(os.environ.get("LAW_API_BREAKER_THRESHOLD", "3")),
+                cooldown=float(os.environ.get("LAW_API_BREAKER_COOLDOWN", "30")),
+            )
+            _breakers[name] = breaker
+        return breaker
+
+
+def ordered_configs(key):
+    """키별로 마지막에 성공한 엔드포인트를 먼저 시도하도록 정렬한 설정 목록"""
+    configs = endpoint_configs(key.is_base64)
+    preferred = _preferred_urls.get(key.name)
+    if preferred:
+        configs.sort(key=lambda cfg: cfg["url"] != preferred)
+    return configs
+
+
+# 헤지 요청: 엔드포인트별 최근 응답 시간과 헤지 통계
+_latencies = {}
+_hedge_stats = {"lookups": 0, "hedged": 0, "primary_wins": 0, "hedge_wins": 0}
+_hedge_lock = threading.Lock()
+_hedge_executor = None
+LATENCY_WINDOW = 200
+MIN_LATENCY_SAMPLES = 20
+
+
+def _record_success(cfg, key, key_pool, elapsed=None):
+    endpoint_breaker(cfg, key).record_success()
+    key_pool.record_success(key)
+    _preferred_urls[key.name] = cfg["url"]
+    if elapsed is not None:
+        with _hedge_lock:
+            _latencies.setdefault(cfg["url"], deque(maxlen=LATENCY_WINDOW)).append(elapsed)
+
+
+def hedging_enabled():
+    return os.environ.get("LAW_API_HEDGE", "0") == "1"
+
+
+def hedge_delay(url):
+    """헤지 요청을 보내기까지 기다릴 시간(초)
+
+    최근 응답 시간의 LAW_API_HEDGE_PERCENTILE 백분위수를 사용하고, 표본이 부족하면
+    LAW_API_HEDGE_DELAY를 사용합니다. LAW_API_HEDGE_MIN_DELAY보다 짧아지지 않습니다.
+    """
+    pct = float(os.environ.get("LAW_API_HEDGE_PERCENTILE", "95"))
+    min_delay = float(os.environ.get("LAW_API_HEDGE_MIN_DELAY", "0.3"))
+    with _hedge_lock:
+        samples = sorted(_latencies.get(url, ()))
+    if len(samples) < MIN_LATENCY_SAMPLES:
+        return max(min_delay, float(os.environ.get("LAW_API_HEDGE_DELAY", "1.0")))
+    idx = min(len(samples) - 1, int(len(samples) * pct / 100))
+    return max(min_delay, samples[idx])
+
+
+def _get_hedge_executor():
+    global _hedge_executor
+    with _hedge_lock:
+        if _hedge_executor is None:
+            _hedge_executor = ThreadPoolExecutor(
+                max_workers=int(os.environ.get("LAW_API_HEDGE_WORKERS", "16")),
+                thread_name_prefix="law-api-hedge",
+            )
+        return _hedge_executor
+
+
+def _count_hedge(key):
+    with _hedge_lock:
+        _hedge_stats[key] += 1
+
+
+def endpoint_status(key_pool=None):
+    """엔드포인트별 차단기 상태, 실패 횟수, 헤지 통계, 키별 사용량 (상태 API 노출용)"""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    with _hedge_lock:
+        hedge = dict(_hedge_stats)
+        urls = list(_latencies)
+    hedge["rate"] = round(hedge["hedged"] / hedge["lookups"], 3) if hedge["lookups"] else 0.0
+    hedge["delay"] = {url: round(hedge_delay(url), 3) for url in urls}
+    return {
+        "preferred": dict(_preferred_urls),
+        "breakers": {b.name: b.snapshot() for b in breakers},
+        "hedge": hedge,
+        "keys": key_pool.stats() if key_pool else [],
+    }
+
+
+def endpoint_limiter(url, key):
+    """엔드포인트(호스트)·키별 초당 요청 수 제한 (LAW_API_REQUESTS_PER_SEC)
+
+    한도는 키마다 따로 적용되므로 키가 늘어나면 전체 처리량도 늘어납니다.
+    """
+    return get_limiter(
+        f"{urlparse(url).hostname}:{key.name}",
+        rate=float(os.environ.get("LAW_API_REQUESTS_PER_SEC", "10")),
+    )
+
+
+def normalize_law_name(name):
+    """색인 키용 법령명 정규화 (공백, 낫표, 괄호, 가운뎃점 제거)"""
+    return re.sub(r"[\s「」『』()\[\]·ㆍ'\"]", "", name or "")
+
+
+def _format_date(value):
+    if len(value) == 8:
+        return f"{value[:4]}. {value[4:6]}. {value[6:8]}."
+    return value
+
+
+def extract_law_fields(law_node):
+    """검색 결과 노드에서 시행/공포/개정 필드를 추출합니다 (캐시 저장 단위)."""
+    return {
+        "시행일자": law_node.findtext("시행일자") or law_node.findtext("발령일자") or "",
+        "공포번호": law_node.findtext("공포번호") or law_node.findtext("발령번호") or "",
+        "공포일자": law_node.findtext("공포일자") or law_node.findtext("발령일자") or "",
+        "법령구분명": law_node.findtext("법령구분명")
+        or law_node.findtext("행정규칙종류명")
+        or "",
+        "제개정구분명": law_node.findtext("제개정구분명") or "",
+    }
+
+
+def format_law_info(fields, category_type):
+    """추출한 필드를 화면/엑셀 표시용 값으로 변환합니다."""
+    impl_date = _format_date(fields.get("시행일자") or "")
+    pnt_no = fields.get("공포번호") or ""
+    pnt_date = _format_date(fields.get("공포일자") or "")
+    cat_name = fields.get("법령구분명") or category_type
+    rev_name = fields.get("제개정구분명") or "-"
+
+    full_info = f"[시행 {impl_date}] [{cat_name} 제{pnt_no}호, {pnt_date}, {rev_name}]"
+    return {
+        "시행/개정": full_info,
+        "시행일": impl_date or "-",
+        "개정유형": rev_name,
+        "개정정보": f"{cat_name} 제{pnt_no}호" if pnt_no else "-",
+        "개정일": pnt_date or "-",
+        # 조회 색인(law_index)용 날짜 (YYYY-MM-DD)
+        "시행일_date": parse_date(fields.get("시행일자") or ""),
+        "개정일_date": parse_date(fields.get("공포일자") or ""),
+    }
+
+
+def _classify_error(status_code, content):
+    """오류 응답을 'quota'(사용 한도), 'auth'(인증), 'error'(기타)로 분류합니다."""
+    if status_code == 429 or any(msg in content for msg in QUOTA_ERROR_MARKERS):
+        return "quota"
+    if status_code in (401, 403) or any(msg in content for msg in AUTH_ERROR_MARKERS):
+        return "auth"
+    return "error"
+
+
+def _request(cfg, key, key_pool, params, parse):
+    """인증 파라미터를 붙여 요청하고 응답 바이트에 parse를 적용한 결과를 반환합니다.
+
+    반환값: (정상 응답 여부, parse 결과). 실패 시 차단기·키 통계에 기록합니다.
+    """
+    breaker = endpoint_breaker(cfg, key)
+    endpoint = urlparse(cfg["url"]).hostname
+    start = None
+
+    def fail(reason, kind="error", outcome=None):
+        breaker.record_failure(reason)
+        key_pool.record_error(key, reason, kind)
+        if start is not None:
+            REQUEST_SECONDS.observe(
+                time.perf_counter() - start, endpoint=endpoint, outcome=outcome or kind
+            )
+        return False, None
+
+    try:
+        with profiling.span("rate_limit", endpoint):
+            endpoint_limiter(cfg["url"], key).acquire()
+        key_pool.record_request(key)
+        start = time.perf_counter()
+        with profiling.span("api", endpoint):
+            response = http_client.get(
+                cfg["url"], params={cfg["param"]: key.value, **params}, verify=False
+            )
+        elapsed = time.perf_counter() - start
+    except Exception as e:
+        print(f"DEBUG: Connection error on {cfg['url']}: {e}")
+        return fail(type(e).__name__, outcome="connection")
+
+    if response.status_code != 200:
+        # 401/403, 429 등 오류 시 다음 설정 시도
+        kind = _classify_error(response.status_code, "")
+        print(f"DEBUG: HTTP {response.status_code} on {cfg['url']} with {key.name}, trying next...")
+        return fail(f"HTTP {response.status_code}", kind, "http" if kind == "error" else kind)
+
+    # 응답 바이트를 그대로 순차 파싱 (오류 응답은 구조로 판별)
+    try:
+        result = parse(response.content)
+    except law_xml.ApiErrorResponse as e:
+        kind = _classify_error(response.status_code, str(e))
+        print(f"DEBUG: API error ({kind}) on {cfg['url']} with {key.name}: {str(e)[:80]}")
+        return fail(kind, kind)
+    except law_xml.MalformedResponse:
+        return fail("parse", outcome="parse")
+
+    _record_success(cfg, key, key_pool, elapsed)
+    REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint=endpoint, outcome="ok")
+    return True, result
+
+
+def _query_endpoint(cfg, key, key_pool, name, target):
+    """엔드포인트 하나에 법령명을 조회합니다.
+
+    반환값: (정상 응답 여부, 필드 dict 또는 None)
+    """
+    return _request(
+        cfg,
+        key,
+        key_pool,
+        {"target": target, "type": "XML", "query": name, "mobileYn": "Y"},
+        lambda content: law_xml.find_first(content, target, extract_law_fields),
+    )
+
+
+def _hedged_fetch(configs, key, key_pool, name, target):
+    """1순위 엔드포인트가 hedge_delay 안에 응답하지 않으면 2순위에도 같은 조회를 보내고,
+    먼저 도착한 결과를 사용합니다. 진 쪽은 아직 시작 전이면 취소하고, 이미 전송 중이면
+    결과를 버립니다."""
+    primary, secondary = configs[0], configs[1]
+    executor = _get_hedge_executor()
+    _count_hedge("lookups")
+
+    args = (key, key_pool, name, target)
+    futures = {executor.submit(_query_endpoint, primary, *args): primary}
+    done, _ = wait(futures, timeout=hedge_delay(primary["url"]))
+    if not done and endpoint_breaker(secondary, key).allow():
+        _count_hedge("hedged")
+        futures[executor.submit(_query_endpoint, secondary, *args)] = secondary
+
+    any_ok = False
+    pending = set(futures)
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            ok, fields = future.result()
+            any_ok = any_ok or ok
+            if fields is None:
+                continue
+            if len(futures) > 1:
+                _count_hedge("hedge_wins" if futures[future] is secondary else "primary_wins")
+            for other in pending:
+                other.cancel()
+            return True, fields
+
+    # 헤지하지 않았고 1순위에서 결과를 얻지 못했으면 나머지 설정을 순서대로 시도
+    tried = list(futures.values())
+    for cfg in configs:
+        if any(cfg is t for t in tried) or not endpoint_breaker(cfg, key).allow():
+            continue
+        ok, fields = _query_endpoint(cfg, *args)
+        any_ok = any_ok or ok
+        if fields is not None:
+            return True, fields
+    return any_ok, None
+
+
+def fetch_law_fields(name, target, key, key_pool):
+    """키 하나로 법령명의 필드를 조회합니다.
+
+    반환값: (정상 응답을 받은 엔드포인트가 있었는지, 필드 dict 또는 None)
+    """
+    configs = ordered_configs(key)
+    if hedging_enabled() and endpoint_breaker(configs[0], key).allow():
+        return _hedged_fetch(configs, key, key_pool, name, target)
+
+    any_ok = False
+    for cfg in configs:
+        if not endpoint_breaker(cfg, key).allow():
+            continue  # 차단된 엔드포인트는 건너뜀
+        ok, fields = _query_endpoint(cfg, key, key_pool, name, target)
+        any_ok = any_ok or ok
+        if fields is not None:
+            return True, fields
+
+    return any_ok, None
+
+
+def _index_entry(node):
+    law_name = (
+        node.findtext("법령명한글")
+        or node.findtext("행정규칙명")
+        or node.findtext("법령명")
+        or ""
+    )
+    return law_name, extract_law_fields(node)
+
+
+def fetch_law_index(target, key_pool, org=None, page_size=None):
+    """소관부처의 법령/행정규칙 목록을 페이지 단위로 받아 색인을 만듭니다.
+
+    반환값: {정규화된 법령명: 필드 dict}. 모든 키·설정이 실패하면 None.
+    같은 이름이 여러 번 나오면 단건 조회와 같이 먼저 나온 항목을 사용합니다.
+    """
+    org = org or os.environ.get("LAW_API_ORG", FTC_ORG_CODE)
+    page_size = page_size or int(os.environ.get("LAW_API_BULK_DISPLAY", BULK_PAGE_SIZE))
+
+    tried = []
+    while True:
+        key = key_pool.acquire(exclude=tried)
+        if key is None:
+            return None
+        tried.append(key)
+        try:
+            for cfg in ordered_configs(key):
+                if not endpoint_breaker(cfg, key).allow():
+                    continue
+                index = None
+                page = 1
+                while True:
+                    ok, result = _request(
+                        cfg,
+                        key,
+                        key_pool,
+                        {
+                            "target": target,
+                            "type": "XML",
+                            "org": org,
+                            "display": page_size,
+                            "page": page,
+                            "mobileYn": "Y",
+                        },
+                        lambda content: law_xml.find_all(content, target, _index_entry),
+                    )
+                    if not ok:
+                        print(f"DEBUG: Bulk {target} page {page} failed on {cfg['url']}")
+                        break
+
+                    if index is None:
+                        index = {}
+                    entries, total_count = result
+                    for law_name, fields in entries:
+                        if law_name:
+                            index.setdefault(normalize_law_name(law_name), fields)
+
+                    if not entries or page * page_size >= total_count:
+                        break
+                    page += 1
+
+                if index is not None:
+                    print(
+                        f"INFO: Bulk {target} index built from {cfg['url']} with {key.name}: {len(index)} names, {page} pages"
+                    )
+                    return index
+        finally:
+            key_pool.release(key)
+
+
+class LawApiUnavailable(Exception):
+    """모든 키·엔드포인트에서 정상 응답을 받지 못한 경우 (일시 오류, 재시도 대상)"""
+
+
+def lookup_law(
+    name,
+    category_type,
+    key_pool,
+    cache=None,
+    force_refresh=False,
+    indexes=None,
+    raise_on_error=False,
+):
+    """법령명 하나의 시행/개정 정보를 조회합니다.
+
+    캐시가 주어지면 만료되지 않은 항목은 API 호출 없이 사용합니다 (force_refresh 시 무시).
+    일괄 조회 색인(indexes: {target: 색인})에 있는 법령은 색인에서 찾고,
+    없는 경우에만 키 풀에서 키를 받아 법령명 단건 조회를 보냅니다. 키 문제로
+    정상 응답을 받지 못하면 다른 키로 다시 시도합니다.
+    반환값: (표시용 정보 dict 또는 None, 캐시 적중 여부)
+    raise_on_error: 검색 결과 없음과 구분하여, 정상 응답을 하나도 받지 못하면
+    LawApiUnavailable을 발생시킵니다.
+    """
+    target = lookup_target(category_type)
+
+    if cache is not None and not force_refresh:
+        fields = cache.get(name, target)
+        if fields is not None:
+            LOOKUPS.inc(source="cache")
+            return format_law_info(fields, category_type), True
+
+    fields = None
+    if indexes and indexes.get(target):
+        fields = indexes[target].get(normalize_law_name(name))
+    source = "index" if fields is not None else "api"
+    tried = []
+    any_ok = fields is not None
+    while fields is None:
+        key = key_pool.acquire(exclude=tried)
+        if key is None:
+            break
+        tried.append(key)
+        try:
+            ok, fields = fetch_law_fields(name, target, key, key_pool)
+        finally:
+            key_pool.release(key)
+        if ok:
+            any_ok = True
+            break  # 정상 응답을 받았으면 (검색 결과 없음 포함) 다른 키로 재시도하지 않음
+    if fields is None:
+        LOOKUPS.inc(source="not_found" if any_ok else "error")
+        if raise_on_error and not any_ok:
+            raise LawApiUnavailable(f"{name}: 정상 응답을 받지 못했습니다.")
+        return None, False
+    LOOKUPS.inc(source=source)
+    if cache is not None:
+        cache.put(name, target, fields)
+    return format_law_info(fields, category_type), False
@@ -0,0 +1,53 @@
+import sqlite3
+import threading
+import time
+
+# 캐시에 보관하는 API 응답 필드
+FIELDS = ["시행일자", "공포번호", "공포일자", "법령구분명", "제개정구분명"]
+
+
+class LawInfoCache:
+    """(법령명, 조회 대상) 단위의 시행/개정 정보 SQLite 캐시"""
+
+    def __init__(self, path, ttl=24 * 3600):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS law_info (
+                query TEXT NOT NULL,
+                target TEXT NOT NULL,
+                시행일자 TEXT,
+                공포번호 TEXT,
+                공포일자 TEXT,
+                법령구분명 TEXT,
+                제개정구분명 TEXT,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (query, target)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, query, target):
+        """TTL 이내의 캐시 항목(dict)을 반환합니다. 없거나 만료되면 None."""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(FIELDS)}, fetched_at FROM law_info"
+                " WHERE query = ? AND target = ?",
+                (query, target),
+            ).fetchone()
+        if row is None or time.time() - row[-1] > self.ttl:
+            return None
+        return dict(zip(FIELDS, row[:-1]))
+
+    def put(self, query, target, fields):
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO law_info (query, target, {', '.join(FIELDS)}, fetched_at)"
+                f" VALUES (?, ?, {', '.join('?' for _ in FIELDS)}, ?)",
+                [query, target] + [fields.get(f, "") for f in FIELDS] + [time.time()],
+            )
+            self._conn.commit()
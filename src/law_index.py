@@ -0,0 +1,92 @@
+import bisect
+import re
+from datetime import date
+
+# 일치 조건을 지원하는 필드
+EQUALITY_FIELDS = ["법령명", "구분", "담당부서"]
+# 범위 조건을 지원하는 날짜 필드 → 해석된 날짜(YYYY-MM-DD)를 담는 필드
+DATE_FIELDS = {"시행일": "시행일_date", "개정일": "개정일_date"}
+
+_DATE_PATTERN = re.compile(r"(\d{4})\D{0,3}(\d{1,2})\D{0,3}(\d{1,2})")
+
+
+def parse_date(value):
+    """'2025. 01. 21.', '2025-01-21', '20250121' 형식을 'YYYY-MM-DD'로 변환합니다.
+
+    해석할 수 없으면 빈 문자열을 반환합니다.
+    """
+    match = _DATE_PATTERN.search(value or "")
+    if not match:
+        return ""
+    try:
+        return date(*(int(g) for g in match.groups())).isoformat()
+    except ValueError:
+        return ""
+
+
+def row_date(row, field):
+    """행의 날짜 필드 값 (해석된 필드가 없던 이전 데이터는 표시용 문자열에서 해석)"""
+    return row.get(DATE_FIELDS[field]) or parse_date(row.get(field, ""))
+
+
+class LawIndex:
+    """수집 결과 행에 대한 보조 색인 (data_version 단위로 생성, 읽기 전용)
+
+    - 일치 색인: 필드 값 → 행 번호 집합
+    - 날짜 색인: 날짜순으로 정렬된 (날짜 목록, 행 번호 목록), 범위는 bisect로 탐색
+    """
+
+    def __init__(self, rows, version=0):
+        self.rows = rows
+        self.version = version
+        self.equality = {field: {} for field in EQUALITY_FIELDS}
+        entries = {field: [] for field in DATE_FIELDS}
+        for idx, row in enumerate(rows):
+            for field in EQUALITY_FIELDS:
+                self.equality[field].setdefault(row.get(field, ""), set()).add(idx)
+            for field in DATE_FIELDS:
+                value = row_date(row, field)
+                if value:
+                    entries[field].append((value, idx))
+        self.dates = {}
+        self.undated = {}
+        for field, pairs in entries.items():
+            pairs.sort()
+            self.dates[field] = ([d for d, _ in pairs], [i for _, i in pairs])
+            dated = {i for _, i in pairs}
+            self.undated[field] = [i for i in range(len(rows)) if i not in dated]
+
+    def _range(self, field, start=None, end=None):
+        """start <= 날짜 <= end인 행 번호 집합 (날짜가 없는 행 제외)"""
+        keys, idxs = self.dates[field]
+        lo = bisect.bisect_left(keys, start) if start else 0
+        hi = bisect.bisect_right(keys, end) if end else len(keys)
+        return set(idxs[lo:hi])
+
+    def query(self, equals=None, ranges=None, sort=None):
+        """조건에 맞는 행 번호 목록을 반환합니다.
+
+        equals: {필드: 값 집합} (값 중 하나와 일치)
+        ranges: {날짜 필드: (시작, 끝)} (YYYY-MM-DD, 한쪽은 None 가능)
+        sort: 날짜 필드명 (앞에 '-'를 붙이면 내림차순, 날짜 없는 행은 마지막), 생략 시 원래 순서
+        """
+        candidates = []
+        for field, values in (equals or {}).items():
+            index = self.equality[field]
+            candidates.append(set().union(*(index.get(v, set()) for v in values)))
+        for field, (start, end) in (ranges or {}).items():
+            candidates.append(self._range(field, start, end))
+
+        if candidates:
+            candidates.sort(key=len)
+            matched = candidates[0].intersection(*candidates[1:])
+        else:
+            matched = None
+
+        if not sort:
+            return sorted(matched) if matched is not None else list(range(len(self.rows)))
+
+        field = sort.lstrip("-")
+        idxs = self.dates[field][1]
+        ordered = idxs[::-1] if sort.startswith("-") else idxs
+        return [i for i in ordered + self.undated[field] if matched is None or i in matched]
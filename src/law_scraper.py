@@ -10,6 +10,10 @@ import time
 import re
 import os
 
+# WebDriver 하나로 조회한 페이지가 이 수를 넘으면 새 WebDriver로 교체 (Chrome 메모리 증가 방지,
+# BROWSER_MAX_PAGES로 변경)
+MAX_DRIVER_PAGES = 500
+
 def get_driver():
     """Chrome WebDriver 설정"""
     chrome_options = Options()
@@ -172,6 +176,8 @@ def scrape_law_dates(filename):
         return
 
     processed_count = 0
+    driver_pages = 0
+    max_driver_pages = int(os.environ.get("BROWSER_MAX_PAGES", str(MAX_DRIVER_PAGES)))
     success_count = 0
     fail_count = 0
     
@@ -189,6 +195,15 @@ def scrape_law_dates(filename):
                 target_url = cell_c.hyperlink.target
             
             if target_url:
+                # 오래 사용한 WebDriver는 종료하고 새로 시작
+                driver_pages += 1
+                if driver_pages > max_driver_pages:
+                    driver.quit()
+                    driver = get_driver()
+                    if not driver:
+                        print("[ERROR] WebDriver를 다시 초기화할 수 없습니다.", flush=True)
+                        break
+                    driver_pages = 1
                 try:
                     extracted_text = extract_implementation_date(driver, target_url)
                     
@@ -219,7 +234,8 @@ def scrape_law_dates(filename):
     
     finally:
         # WebDriver 종료
-        driver.quit()
+        if driver:
+            driver.quit()
         print("\n[INFO] WebDriver 종료", flush=True)
 
     # 결과 저장
@@ -0,0 +1,107 @@
+# XML 파서 (lxml이 없으면 표준 라이브러리 사용)
+try:
+    from lxml import etree
+
+    HAS_LXML = True
+    XML_SYNTAX_ERRORS = (etree.XMLSyntaxError,)
+except ImportError:
+    import xml.etree.ElementTree as etree
+
+    HAS_LXML = False
+    XML_SYNTAX_ERRORS = (etree.ParseError,)
+
+# 오류 응답을 나타내는 요소 (data.go.kr 공통 오류 응답, law.go.kr 오류 응답)
+ERROR_TAGS = {
+    "OpenAPI_ServiceResponse",
+    "cmmMsgHeader",
+    "returnAuthMsg",
+    "returnReasonCode",
+    "errMsg",
+    "ErrorCode",
+    "ErrorMsg",
+}
+# 오류 요소 없이 본문에 오류 문구만 담겨 오는 경우
+ERROR_TEXT_MARKERS = ["인증되지 않은", "SERVICE_KEY_IS_NOT_REGISTERED"]
+
+
+class ApiErrorResponse(Exception):
+    """정상 XML이지만 API 오류 응답인 경우 (메시지: 오류 요소의 텍스트)"""
+
+
+class MalformedResponse(Exception):
+    """XML로 해석할 수 없는 응답"""
+
+
+# 한 번에 파서에 넣는 바이트 수 (첫 결과 요소가 보통 앞쪽 1~2KB 안에 끝남)
+FEED_CHUNK_SIZE = 2048
+
+
+def _iterparse(content):
+    """응답 바이트를 조금씩 파서에 넣으면서 (event, elem)을 내보냅니다."""
+    parser = etree.XMLPullParser(events=("start", "end"))
+    for offset in range(0, len(content), FEED_CHUNK_SIZE):
+        parser.feed(content[offset : offset + FEED_CHUNK_SIZE])
+        yield from parser.read_events()
+    parser.close()
+    yield from parser.read_events()
+
+
+def _scan(content, target, on_match):
+    """응답 바이트를 순차 파싱하며 target 요소마다 on_match(elem)를 호출합니다.
+
+    on_match가 True를 반환하면 나머지 문서는 파싱하지 않습니다.
+    반환값: totalCnt 값 (없으면 0)
+    """
+    error_parts = []
+    in_error = False
+    total_count = 0
+    try:
+        for event, elem in _iterparse(content):
+            if event == "start":
+                if elem.tag in ERROR_TAGS:
+                    in_error = True
+                continue
+
+            tag = elem.tag
+            if tag == target:
+                if on_match(elem):
+                    return total_count
+                elem.clear()
+            text = (elem.text or "").strip()
+            if tag == "totalCnt":
+                total_count = int(text) if text.isdigit() else 0
+            elif text and (in_error or any(m in text for m in ERROR_TEXT_MARKERS)):
+                error_parts.append(text)
+    except XML_SYNTAX_ERRORS as e:
+        raise MalformedResponse(str(e))
+
+    if error_parts:
+        raise ApiErrorResponse(" ".join(error_parts))
+    return total_count
+
+
+def find_first(content, target, extract):
+    """첫 번째 target 요소에 extract를 적용한 결과를 반환합니다 (없으면 None).
+
+    첫 요소를 찾는 즉시 파싱을 멈춥니다.
+    """
+    found = []
+
+    def on_match(elem):
+        found.append(extract(elem))
+        return True
+
+    _scan(content, target, on_match)
+    return found[0] if found else None
+
+
+def find_all(content, target, extract):
+    """모든 target 요소에 extract를 적용합니다. 반환값: (결과 목록, totalCnt)"""
+    results = []
+
+    def on_match(elem):
+        results.append(extract(elem))
+        return False
+
+    total_count = _scan(content, target, on_match)
+    return results, total_count
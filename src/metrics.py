@@ -0,0 +1,239 @@
+import json
+import os
+import socket
+import threading
+import time
+
+# 기본 지연 시간 구간(초)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+# 프로세스별 지표를 공유 저장소에 기록하는 주기(초)와 보관 기간(초)
+FLUSH_INTERVAL = 15
+RETENTION = 24 * 3600
+# 공유 저장소(kv) 키 접두사
+KV_PREFIX = "metrics:"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return json.dumps([str(labels.get(n, "")) for n in self.labelnames], ensure_ascii=False)
+
+    def snapshot(self):
+        with self._lock:
+            return {key: (list(v) if isinstance(v, list) else v) for key, v in self._values.items()}
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    @staticmethod
+    def merge(values, other):
+        for key, value in other.items():
+            values[key] = values.get(key, 0) + value
+
+    def render(self, values):
+        for key, value in sorted(values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, json.loads(key))} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    """구간별 관측 수(누적 아님) + 합계 + 개수를 [b1, ..., bn, +Inf, sum, count]로 보관"""
+
+    type = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        slot = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                slot = i
+                break
+        with self._lock:
+            data = self._values.get(key)
+            if data is None:
+                data = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            data[slot] += 1
+            data[-2] += value
+            data[-1] += 1
+
+    def time(self, **labels):
+        """with 블록의 실행 시간을 기록합니다 (예외가 나도 기록)."""
+        return _Timer(self, labels)
+
+    def merge(self, values, other):
+        size = len(self.buckets) + 3
+        for key, data in other.items():
+            if len(data) != size:
+                continue  # 구간 설정이 다른 프로세스의 기록
+            current = values.setdefault(key, [0] * size)
+            values[key] = [a + b for a, b in zip(current, data)]
+
+    def render(self, values):
+        for key, data in sorted(values.items()):
+            labels = json.loads(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), data):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(data[-2])}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, labels)} {data[-1]}"
+
+
+class _Timer:
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class Registry:
+    """프로세스 내 지표 모음. 여러 프로세스(gunicorn 작업자, worker.py)의 지표는
+    각자 공유 저장소에 기록한 스냅샷을 합쳐서 출력합니다."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._flusher = None
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._register(Counter(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def snapshot(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {m.name: m.snapshot() for m in metrics if m._values}
+
+    def flush(self, store):
+        """이 프로세스의 지표를 공유 저장소에 기록합니다."""
+        # 작업자 재시작 등으로 pid가 바뀌면 다른 키가 되므로 프로세스마다 따로 보관
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        store.set_value(
+            KV_PREFIX + self.owner,
+            json.dumps({"updated": time.time(), "metrics": self.snapshot()}, ensure_ascii=False),
+        )
+
+    def start_flusher(self, store, interval=FLUSH_INTERVAL):
+        """interval초마다 flush하는 스레드를 시작합니다 (프로세스당 한 번)."""
+        with self._lock:
+            if self._flusher is not None and self._flusher[0] == os.getpid():
+                return
+            thread = threading.Thread(
+                target=self._flush_loop, args=(store, interval), name="metrics-flush", daemon=True
+            )
+            self._flusher = (os.getpid(), thread)
+        thread.start()
+
+    def _flush_loop(self, store, interval):
+        while True:
+            time.sleep(interval)
+            try:
+                self.flush(store)
+            except Exception as e:
+                print(f"WARNING: 지표 기록 실패: {e}")
+
+    def collect(self, store, retention=RETENTION):
+        """모든 프로세스의 스냅샷을 합친 {지표 이름: 값}. 오래된 스냅샷은 삭제합니다."""
+        self.flush(store)
+        merged = {}
+        now = time.time()
+        for key, raw in store.get_values(KV_PREFIX).items():
+            try:
+                data = json.loads(raw)
+            except ValueError:
+                continue
+            if now - data.get("updated", 0) > retention:
+                store.delete_value(key)
+                continue
+            for name, values in data.get("metrics", {}).items():
+                metric = self._metrics.get(name)
+                if metric is not None:
+                    metric.merge(merged.setdefault(name, {}), values)
+        return merged
+
+    def render(self, store, gauges=None):
+        """Prometheus 텍스트 형식 (text/plain; version=0.0.4)
+
+        gauges: [(이름, 설명, [(라벨 dict, 값)])] 요청 시점에 계산한 값
+        """
+        merged = self.collect(store)
+        lines = []
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.render(merged.get(metric.name, {})))
+        for name, help_text, samples in gauges or []:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            for labels, value in samples:
+                names = sorted(labels)
+                lines.append(
+                    f"{name}{_format_labels(names, [labels[n] for n in names])} {_format_value(value)}"
+                )
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def counter(name, help_text, labelnames=()):
+    return REGISTRY.counter(name, help_text, labelnames)
+
+
+def histogram(name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+    return REGISTRY.histogram(name, help_text, labelnames, buckets)
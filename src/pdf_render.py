@@ -0,0 +1,272 @@
+import asyncio
+import html
+import os
+from urllib.parse import urljoin, urlparse
+
+from bs4 import BeautifulSoup
+
+import http_client
+import metrics
+
+# 페이지 로딩 제한 시간(ms)
+PAGE_TIMEOUT_MS = 60000
+# 법령 본문이 들어 있는 iframe (law_scraper.extract_implementation_date와 같은 기준)
+LAW_FRAME_SELECTOR = "iframe#lawService"
+# iframe 문서가 다 읽히고 본문이 채워졌는지 확인하는 스크립트
+FRAME_READY_JS = (
+    "() => document.readyState === 'complete'"
+    " && !!document.body && document.body.innerText.trim().length > 0"
+)
+# 인쇄 결과에 필요 없는 요청 종류 (PDF_BLOCK_RESOURCES로 변경)
+DEFAULT_BLOCKED_TYPES = "image,font,media"
+# 재생·연결 유지 요청은 항상 차단 (networkidle 대기를 막던 요청)
+ALWAYS_BLOCKED_TYPES = {"eventsource", "websocket", "manifest", "ping"}
+# 페이지 사이트 외에 스크립트·스타일을 허용하는 사이트 (법령 본문 iframe)
+DEFAULT_ALLOWED_SITES = ("law.go.kr",)
+# 국가 도메인 아래 2단계 도메인 (예: law.go.kr → go.kr 아래 사이트)
+SECOND_LEVEL_LABELS = {"go", "co", "or", "ac", "re", "ne", "pe"}
+
+# 본문 추출 방식의 머리글에 쓰는 수집 결과 필드
+PDF_HEADER_FIELDS = ["법령명_상세", "구분", "시행일", "개정유형", "담당부서"]
+# 본문 추출 방식에서 제거하는 요소 (인쇄 결과에 보이지 않거나 다시 요청을 만드는 요소)
+STRIP_TAGS = ["script", "noscript", "iframe", "object", "embed"]
+# 인쇄 템플릿
+PRINT_TEMPLATE = """<!DOCTYPE html>
+<html lang="ko">
+<head>
+<meta charset="utf-8">
+<base href="{base}">
+<title>{title}</title>
+{styles}
+<style>
+@page {{ size: A4; margin: 15mm 12mm; }}
+body {{ font-family: "Malgun Gothic", "Nanum Gothic", "Noto Sans CJK KR", sans-serif; }}
+.print-header {{ border-bottom: 2px solid #333; margin-bottom: 12px; padding-bottom: 6px; }}
+.print-header h1 {{ font-size: 18pt; margin: 0 0 4px; }}
+.print-header p {{ color: #444; font-size: 10pt; margin: 0; }}
+</style>
+</head>
+<body>
+<header class="print-header"><h1>{title}</h1><p>{info}</p></header>
+<main>{body}</main>
+</body>
+</html>"""
+
+BLOCKED_REQUESTS = metrics.counter(
+    "ftc_pdf_blocked_requests_total", "PDF 렌더링 중 차단한 요청 수", ("type",)
+)
+CONTENT_RENDERS = metrics.counter(
+    "ftc_pdf_content_renders_total", "본문 추출 방식 렌더링 결과 (content, fallback)", ("result",)
+)
+
+
+def safe_filename(name):
+    """법령명에서 파일 이름으로 쓸 수 있는 문자만 남깁니다."""
+    return "".join([c for c in name if c.isalnum() or c in (" ", "_")]).strip()
+
+
+def fetch_html(url):
+    """문서를 HTTP로 가져와 (본문 문자열, 최종 URL)을 반환합니다."""
+    response = http_client.get(url, verify=False)
+    response.raise_for_status()
+    encoding = (response.apparent_encoding or "").lower()
+    if "euc-kr" in encoding or "cp949" in encoding:
+        response.encoding = response.apparent_encoding
+    else:
+        response.encoding = "utf-8"
+    return response.text, response.url
+
+
+def header_info(meta):
+    """머리글 둘째 줄 (구분 · 시행 … · 개정유형 · 담당부서, 값이 없는 항목 제외)"""
+    parts = []
+    for field, label in (("구분", ""), ("시행일", "시행 "), ("개정유형", ""), ("담당부서", "")):
+        value = str(meta.get(field) or "").strip()
+        if value and value != "-":
+            parts.append(label + value)
+    return " · ".join(parts)
+
+
+def build_print_document(url, meta=None):
+    """팝업 페이지의 #lawService iframe 문서만 가져와 인쇄 템플릿에 넣습니다.
+
+    반환값: (HTML 문자열, iframe 문서 URL), iframe이나 본문을 찾지 못하면 None
+    """
+    meta = meta or {}
+    outer, outer_url = fetch_html(url)
+    frame = BeautifulSoup(outer, "html.parser").select_one(LAW_FRAME_SELECTOR)
+    if frame is None or not frame.get("src") or frame["src"].startswith("javascript:"):
+        return None
+    frame_url = urljoin(outer_url, frame["src"])
+    inner, frame_url = fetch_html(frame_url)
+    soup = BeautifulSoup(inner, "html.parser")
+    if soup.body is None or not soup.body.get_text(strip=True):
+        return None
+    for tag in soup.body.find_all(STRIP_TAGS):
+        tag.decompose()
+    # 본문 배치에 필요한 스타일만 유지 (스크립트·이미지 등은 route_requests에서 차단)
+    styles = "".join(
+        str(tag)
+        for tag in soup.find_all(["style", "link"])
+        if tag.name == "style" or "stylesheet" in (tag.get("rel") or [])
+    )
+    title = meta.get("법령명_상세") or (soup.title.get_text(strip=True) if soup.title else "")
+    return PRINT_TEMPLATE.format(
+        base=html.escape(frame_url, quote=True),
+        title=html.escape(title),
+        info=html.escape(header_info(meta)),
+        styles=styles,
+        body=soup.body.decode_contents(),
+    ), frame_url
+
+
+def site_of(host):
+    """호스트가 속한 사이트 (www.law.go.kr → law.go.kr, cdn.example.com → example.com)"""
+    labels = (host or "").lower().split(".")
+    second_level = len(labels) >= 3 and len(labels[-1]) == 2 and labels[-2] in SECOND_LEVEL_LABELS
+    size = 3 if second_level else 2
+    return ".".join(labels[-size:])
+
+
+class RenderProfile:
+    """렌더링 방식 (PDF_RENDER_PROFILE)
+
+    - fast: DOMContentLoaded 후 #lawService iframe 본문이 채워질 때까지만 대기하고,
+      이미지·글꼴·미디어(PDF_BLOCK_RESOURCES)와 허용 사이트 밖의 하위 리소스 요청을 차단
+    - content(기본): 팝업 페이지 대신 #lawService iframe 문서를 HTTP로 가져와 제목·시행 정보
+      머리글을 붙인 인쇄 템플릿으로 렌더링 (iframe을 찾지 못하면 fast 방식으로 렌더링)
+    - full: 이전 방식 (networkidle까지 대기, 차단 없음)
+    """
+
+    def __init__(self, name=None, blocked_types=None, allowed_hosts=None):
+        self.name = name or os.environ.get("PDF_RENDER_PROFILE", "content").strip().lower()
+        if blocked_types is None:
+            blocked_types = os.environ.get("PDF_BLOCK_RESOURCES", DEFAULT_BLOCKED_TYPES)
+        self.blocked_types = {t.strip() for t in blocked_types.split(",") if t.strip()}
+        self.blocked_types |= ALWAYS_BLOCKED_TYPES
+        if allowed_hosts is None:
+            allowed_hosts = os.environ.get("PDF_ALLOWED_HOSTS", "")
+        self.allowed_sites = set(DEFAULT_ALLOWED_SITES) | {
+            site_of(h.strip()) for h in allowed_hosts.split(",") if h.strip()
+        }
+
+    @property
+    def fast(self):
+        return self.name != "full"
+
+    @property
+    def content(self):
+        return self.name == "content"
+
+    def should_block(self, page_url, request_url, resource_type):
+        """문서(페이지·iframe)는 허용, 차단 종류이거나 허용 사이트 밖의 하위 리소스는 차단"""
+        if resource_type == "document":
+            return False
+        if resource_type in self.blocked_types:
+            return True
+        site = site_of(urlparse(request_url).hostname)
+        return site != site_of(urlparse(page_url).hostname) and site not in self.allowed_sites
+
+
+async def route_requests(page, url, profile):
+    """page의 요청을 profile 기준으로 차단합니다."""
+
+    async def handle(route):
+        request = route.request
+        if profile.should_block(url, request.url, request.resource_type):
+            BLOCKED_REQUESTS.inc(type=request.resource_type)
+            await route.abort()
+        else:
+            await route.continue_()
+
+    await page.route("**/*", handle)
+
+
+async def wait_until_ready(page, timeout):
+    """#lawService iframe 본문이 채워질 때까지 대기합니다 (iframe이 없으면 load 이벤트까지)."""
+    handle = await page.query_selector(LAW_FRAME_SELECTOR)
+    if handle is None:
+        await page.wait_for_load_state("load", timeout=timeout)
+        handle = await page.query_selector(LAW_FRAME_SELECTOR)
+        if handle is None:
+            return
+    frame = await handle.content_frame()
+    if frame is not None:
+        await frame.wait_for_function(FRAME_READY_JS, timeout=timeout)
+
+
+class PdfRenderer:
+    """공유 브라우저 풀(browser_pool)의 컨텍스트 하나에서 여러 페이지를 동시에 PDF로 저장합니다.
+
+    start()·render()·close()는 풀의 이벤트 루프(BrowserPool.run)에서 실행하고, 동시 실행
+    수는 호출하는 쪽(worker.run_worker)이 제한합니다. 브라우저가 교체 대상이 되거나 종료되면
+    다음 페이지부터 새 컨텍스트를 받고, 이전 컨텍스트는 렌더링 중인 페이지가 끝나면 반납합니다.
+    """
+
+    def __init__(
+        self, pool, timeout=PAGE_TIMEOUT_MS, profile=None, context_options=None, pdf_options=None
+    ):
+        self.pool = pool
+        self.timeout = timeout
+        self.profile = profile or RenderProfile()
+        self.context_options = context_options or {}
+        self.pdf_options = pdf_options or {}
+        self._lease = None
+        self._retired = []
+
+    async def start(self):
+        self._lease = await self.pool.acquire(**self.context_options)
+        return self
+
+    async def _current_lease(self):
+        if not self._lease.usable:
+            previous = self._lease
+            self._lease = await self.pool.acquire(**self.context_options)
+            if previous.in_flight:
+                self._retired.append(previous)
+            else:
+                await self.pool.release(previous)
+        return self._lease
+
+    async def render(self, url, pdf_path, meta=None):
+        """meta: 본문 추출 방식의 머리글 정보 (PDF_HEADER_FIELDS)"""
+        os.makedirs(os.path.dirname(pdf_path), exist_ok=True)
+        document = None
+        if self.profile.content:
+            try:
+                document = await asyncio.to_thread(build_print_document, url, meta)
+            except Exception as e:
+                print(f"WARNING: 본문 추출 실패, 페이지 전체를 렌더링합니다 ({url}): {e}")
+            CONTENT_RENDERS.inc(result="fallback" if document is None else "content")
+        lease = await self._current_lease()
+        page = await lease.context.new_page()
+        lease.in_flight += 1
+        try:
+            if document is not None:
+                content, frame_url = document
+                await route_requests(page, frame_url, self.profile)
+                await page.set_content(content, wait_until="load", timeout=self.timeout)
+            elif self.profile.fast:
+                await route_requests(page, url, self.profile)
+                await page.goto(url, wait_until="domcontentloaded", timeout=self.timeout)
+                await wait_until_ready(page, self.timeout)
+            else:
+                await page.goto(url, wait_until="networkidle", timeout=self.timeout)
+            await page.pdf(path=pdf_path, **self.pdf_options)
+        finally:
+            lease.in_flight -= 1
+            try:
+                await page.close()
+            except Exception:
+                pass  # 브라우저가 종료된 경우 (다음 페이지는 새 브라우저에서 렌더링)
+            await self.pool.page_done(lease)
+            if lease in self._retired and not lease.in_flight:
+                self._retired.remove(lease)
+                await self.pool.release(lease)
+
+    async def close(self):
+        leases = self._retired + ([self._lease] if self._lease is not None else [])
+        self._retired = []
+        self._lease = None
+        for lease in leases:
+            await self.pool.release(lease)
@@ -0,0 +1,183 @@
+import contextlib
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+# 프로파일링 방식: spans(단계·항목별 구간 기록), sample(구간 + 스택 샘플링)
+MODES = ("spans", "sample")
+# 저장소에 구간을 묶어서 기록하는 건수와 최대 간격(초)
+FLUSH_SIZE = 200
+FLUSH_INTERVAL = 2.0
+# 스택 샘플링 간격(초), 스택 최대 깊이, 보관하는 스택 종류 수
+SAMPLE_INTERVAL = 0.01
+MAX_STACK_DEPTH = 40
+MAX_FOLDED_STACKS = 500
+# 저장소(kv)에 샘플링 결과를 보관하는 키 접두사
+KV_PREFIX = "profile:"
+
+_current = threading.local()
+
+
+def span(stage, item=None):
+    """현재 스레드에서 프로파일링 중인 작업에 구간을 기록합니다.
+
+    작업 구간(Job.span) 안에서 호출된 경우에만 기록하고, 그 밖에서는 아무 일도 하지 않습니다.
+    """
+    profiler = current()
+    if profiler is None:
+        return contextlib.nullcontext()
+    return profiler.span(stage, item)
+
+
+def current():
+    """현재 스레드에서 프로파일링 중인 작업의 JobProfiler (없으면 None)"""
+    return getattr(_current, "profiler", None)
+
+
+class JobProfiler:
+    """작업 하나의 구간(stage, item, 스레드, 시작 시각, 소요 시간)을 저장소에 기록합니다.
+
+    sample 방식이면 지금 구간 안에 있는 스레드들의 스택을 SAMPLE_INTERVAL마다 수집해
+    folded 형식(flamegraph.pl, speedscope 입력)으로 보관합니다.
+    """
+
+    def __init__(self, job_id, store, mode="spans"):
+        self.job_id = job_id
+        self.store = store
+        self.mode = mode
+        self._pending = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        # 구간 안에 있는 스레드 -> 열린 구간 수 (마지막 구간이 끝나면 제거)
+        self._threads = {}
+        self._stacks = Counter()
+        self._stop = threading.Event()
+        self._sampler = None
+
+    def start(self):
+        if self.mode == "sample":
+            previous = self.store.get_value(KV_PREFIX + self.job_id)
+            if previous:
+                # 이어서 실행한 작업은 이전 실행의 샘플에 더함
+                self._stacks.update(parse_folded(previous))
+            self._sampler = threading.Thread(
+                target=self._sample_loop, name=f"profile-{self.job_id}", daemon=True
+            )
+            self._sampler.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+            self.store.set_value(KV_PREFIX + self.job_id, self.folded())
+        self.flush()
+
+    @contextlib.contextmanager
+    def span(self, stage, item=None):
+        previous = getattr(_current, "profiler", None)
+        _current.profiler = self
+        ident = threading.get_ident()
+        with self._lock:
+            self._threads[ident] = self._threads.get(ident, 0) + 1
+        try:
+            with self.timed(stage, item):
+                yield
+        finally:
+            _current.profiler = previous
+            with self._lock:
+                depth = self._threads.pop(ident) - 1
+                if depth:
+                    self._threads[ident] = depth
+
+    @contextlib.contextmanager
+    def timed(self, stage, item=None):
+        """스레드를 이 작업에 연결하지 않고 구간만 기록합니다.
+
+        여러 작업의 코루틴이 번갈아 실행되는 공유 이벤트 루프(browser_pool)에서 사용합니다.
+        """
+        started = time.time()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(stage, item, started, time.perf_counter() - start)
+
+    def _record(self, stage, item, started, duration):
+        entry = (
+            stage,
+            None if item is None else str(item),
+            threading.current_thread().name,
+            started,
+            duration,
+        )
+        with self._lock:
+            self._pending.append(entry)
+            due = (
+                len(self._pending) >= FLUSH_SIZE
+                or time.monotonic() - self._last_flush >= FLUSH_INTERVAL
+            )
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, []
+            self._last_flush = time.monotonic()
+        if pending:
+            self.store.record_spans(self.job_id, pending)
+
+    def _sample_loop(self):
+        while not self._stop.wait(SAMPLE_INTERVAL):
+            frames = sys._current_frames()
+            with self._lock:
+                active = list(self._threads)
+            for ident in active:
+                frame = frames.get(ident)
+                if frame is None:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)})")
+                    frame = frame.f_back
+                self._stacks[";".join(reversed(stack))] += 1
+
+    def folded(self):
+        """'호출자;...;함수 샘플 수' 줄 목록 (많이 관측된 스택부터 MAX_FOLDED_STACKS개)"""
+        return "\n".join(
+            f"{stack} {count}" for stack, count in self._stacks.most_common(MAX_FOLDED_STACKS)
+        )
+
+
+def parse_folded(text):
+    stacks = Counter()
+    for line in (text or "").splitlines():
+        stack, _, count = line.rpartition(" ")
+        if stack and count.isdigit():
+            stacks[stack] += int(count)
+    return stacks
+
+
+def hot_functions(folded, limit=30):
+    """샘플링 결과에서 함수별 self(스택 맨 위)·total(스택에 포함) 샘플 수 상위 목록"""
+    self_counts = Counter()
+    total_counts = Counter()
+    samples = 0
+    for stack, count in parse_folded(folded).items():
+        frames = stack.split(";")
+        samples += count
+        self_counts[frames[-1]] += count
+        for name in set(frames):
+            total_counts[name] += count
+    return [
+        {
+            "function": name,
+            "self": self_counts[name],
+            "total": total_counts[name],
+            "self_pct": round(self_counts[name] / samples * 100, 1),
+        }
+        for name, _ in self_counts.most_common(limit)
+    ]
@@ -0,0 +1,49 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """토큰 버킷 방식의 요청 속도 제한기 (여러 스레드에서 공유 가능)"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)  # 초당 충전되는 토큰 수
+        self.capacity = float(capacity) if capacity else max(1.0, self.rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def acquire(self, tokens=1):
+        """토큰을 얻을 때까지 대기합니다. 실제 대기한 시간(초)을 반환합니다."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+
+# 호스트별 공유 제한기
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(host, rate=1.0, capacity=None):
+    """호스트별 공유 토큰 버킷을 반환합니다 (최초 호출 시의 rate/capacity로 생성)."""
+    with _limiters_lock:
+        limiter = _limiters.get(host)
+        if limiter is None:
+            limiter = TokenBucket(rate, capacity)
+            _limiters[host] = limiter
+        return limiter
+
@@ -0,0 +1,107 @@
+import gzip
+import threading
+from collections import OrderedDict
+
+from flask import request
+
+import metrics
+
+# brotli는 선택 설치 (없으면 gzip만 사용)
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# 이보다 작은 응답은 압축하지 않음 (바이트)
+COMPRESS_MIN_BYTES = 1024
+# 압축된 응답 본문 보관 수 (ETag 단위)
+CACHE_SIZE = 32
+
+RESPONSES = metrics.counter(
+    "ftc_response_cache_total", "JSON 응답 재사용 결과 (not_modified, hit, miss)", ("result",)
+)
+
+
+def negotiate_encoding():
+    """Accept-Encoding에서 사용할 압축 방식을 고릅니다 (br > gzip, 없으면 None)."""
+    accepted = {}
+    for part in request.headers.get("Accept-Encoding", "").split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    if brotli is not None and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+def _compress(data, encoding):
+    if encoding == "br":
+        return brotli.compress(data, quality=5)
+    return gzip.compress(data, compresslevel=6)
+
+
+class CachedJsonResponder:
+    """데이터 버전 기반 ETag로 304 응답과 압축 본문 재사용을 처리합니다.
+
+    ETag에 압축 방식을 포함하므로(…-gzip, …-br) 304 판단은 본문을
+    만들기 전에 끝납니다. 조회·직렬화는 build_body 안에서 하므로 304나
+    캐시 적중이면 실행되지 않습니다.
+    """
+
+    def __init__(self, app, size=CACHE_SIZE):
+        self.app = app
+        self.size = size
+        self._bodies = OrderedDict()
+        self._lock = threading.Lock()
+
+    def respond(self, base_etag, build_body, headers=None):
+        """build_body(): JSON 문자열 또는 (JSON 문자열, 헤더 dict)를 반환하는 함수
+        (304·캐시 적중 시 호출하지 않음)
+
+        build_body가 반환한 헤더(조회 건수 등 본문을 만들 때 계산하는 값)는 본문과 함께
+        보관해 캐시 적중 응답에도 붙이고, headers는 304를 포함한 모든 응답에 붙입니다.
+        """
+        encoding = negotiate_encoding()
+        etag = f"{base_etag}-{encoding}" if encoding else base_etag
+        if request.if_none_match.contains(etag):
+            RESPONSES.inc(result="not_modified")
+            resp = self.app.response_class(status=304)
+        else:
+            with self._lock:
+                cached = self._bodies.get(etag)
+                if cached is not None:
+                    self._bodies.move_to_end(etag)
+            RESPONSES.inc(result="miss" if cached is None else "hit")
+            if cached is None:
+                built = build_body()
+                body, body_headers = built if isinstance(built, tuple) else (built, {})
+                data = body.encode("utf-8")
+                used = encoding if encoding and len(data) >= COMPRESS_MIN_BYTES else None
+                if used:
+                    data = _compress(data, used)
+                cached = (data, used, body_headers)
+                with self._lock:
+                    self._bodies[etag] = cached
+                    while len(self._bodies) > self.size:
+                        self._bodies.popitem(last=False)
+            data, used, body_headers = cached
+            resp = self.app.response_class(data, mimetype="application/json")
+            if used:
+                resp.headers["Content-Encoding"] = used
+            for name, value in body_headers.items():
+                resp.headers[name] = value
+        resp.set_etag(etag)
+        # 저장은 허용하되 매번 ETag로 재검증
+        resp.headers["Cache-Control"] = "no-cache"
+        resp.headers["Vary"] = "Accept-Encoding"
+        for name, value in (headers or {}).items():
+            resp.headers[name] = value
+        return resp
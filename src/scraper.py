@@ -1,13 +1,18 @@
-﻿import requests
-from bs4 import BeautifulSoup
+﻿from bs4 import BeautifulSoup
 import urllib3
+import http_client
+from http_cache import get_page_cache, content_hash, HttpCache
 
 # SSL 경고 메시지 무시 설정 (폐쇄망/프록시 환경 대응)
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 import pandas as pd
+import os
 import time
 import random
 import re
+from rate_limiter import get_limiter
+import metrics
+import profiling
 
 # --- Constants ---
 BASE_URL = "https://www.ftc.go.kr"
@@ -15,6 +20,7 @@ BASE_PAGE_URL = "https://www.ftc.go.kr/www/selectCmitJrsdLawordList.do?key={key}
 OUTPUT_FILE = "ftc_law_data.xlsx"
 SEARCH_LAWORD_CL_CD_START = 1
 SEARCH_LAWORD_CL_CD_END = 3
+FTC_HOST = "www.ftc.go.kr"
 
 USER_AGENTS = [
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36",
@@ -23,7 +29,29 @@ USER_AGENTS = [
     "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36"
 ]
 
-def fetch_page(url, headers=None, timeout=10, session=None):
+FETCH_SECONDS = metrics.histogram(
+    "ftc_page_fetch_seconds", "FTC 페이지 요청 지연 시간 (속도 제한 대기 제외)", ("outcome",)
+)
+RATE_LIMIT_WAIT_SECONDS = metrics.histogram(
+    "ftc_rate_limit_wait_seconds", "FTC 요청 속도 제한 대기 시간"
+)
+PARSE_SECONDS = metrics.histogram(
+    "ftc_page_parse_seconds", "FTC 법령 목록 HTML 파싱 시간"
+)
+PAGE_CACHE = metrics.counter(
+    "ftc_page_cache_total", "FTC 페이지 캐시 사용 결과 (fresh, not_modified, same_hash, miss)", ("result",)
+)
+
+def ftc_limiter():
+    """www.ftc.go.kr 공유 토큰 버킷 (FTC_REQUESTS_PER_SEC, FTC_REQUEST_BURST)"""
+    return get_limiter(
+        FTC_HOST,
+        rate=float(os.environ.get("FTC_REQUESTS_PER_SEC", "2")),
+        capacity=float(os.environ.get("FTC_REQUEST_BURST", "2")),
+    )
+
+def fetch_page_response(url, headers=None, timeout=None, session=None, extra_headers=None):
+    """인코딩이 설정된 응답을 반환합니다 (조건부 요청의 304 응답 포함). 실패 시 None."""
     if headers is None:
         headers = {
             "User-Agent": random.choice(USER_AGENTS),
@@ -38,29 +66,92 @@ def fetch_page(url, headers=None, timeout=10, session=None):
             "Sec-Fetch-Site": "same-origin",
             "Sec-Fetch-User": "?1"
         }
+    if extra_headers:
+        headers = {**headers, **extra_headers}
+    start = None
     try:
-        # 403 방지를 위한 미세 지연
-        time.sleep(random.uniform(0.5, 1.5))
+        # 403 방지를 위한 호스트 단위 속도 제한 (모든 스레드가 공유)
+        with RATE_LIMIT_WAIT_SECONDS.time(), profiling.span("rate_limit"):
+            ftc_limiter().acquire()
         
-        if session:
-            response = session.get(url, headers=headers, timeout=timeout, verify=False)
-        else:
-            response = requests.get(url, headers=headers, timeout=timeout, verify=False)
+        start = time.perf_counter()
+        with profiling.span("fetch", url):
+            if session:
+                response = session.get(url, headers=headers, timeout=timeout, verify=False)
+            else:
+                response = http_client.get(url, headers=headers, timeout=timeout, verify=False)
         response.raise_for_status()
+        if response.status_code == 304:
+            FETCH_SECONDS.observe(time.perf_counter() - start, outcome="not_modified")
+            return response
+        FETCH_SECONDS.observe(time.perf_counter() - start, outcome="ok")
         
         if response.apparent_encoding and ('euc-kr' in response.apparent_encoding.lower() or 'cp949' in response.apparent_encoding.lower()):
             response.encoding = response.apparent_encoding
         else:
             response.encoding = 'utf-8'
-        return BeautifulSoup(response.text, 'html.parser')
+        return response
     except Exception as e:
+        if start is not None:
+            FETCH_SECONDS.observe(time.perf_counter() - start, outcome="error")
         print(f"Error fetching {url}: {e}")
     return None
 
+def fetch_page(url, headers=None, timeout=None, session=None):
+    response = fetch_page_response(url, headers=headers, timeout=timeout, session=session)
+    if response is None or response.status_code == 304:
+        return None
+    return BeautifulSoup(response.text, 'html.parser')
+
+def fetch_page_cached(url):
+    """조건부 GET으로 페이지를 가져옵니다.
+
+    반환값: (본문 또는 None, 캐시된 rows 또는 None). 페이지가 바뀌지 않았으면
+    캐시에 저장된 파싱 결과(rows)를 돌려주므로 다시 파싱할 필요가 없습니다.
+    """
+    cache = get_page_cache()
+    cached = cache.get(url) if cache else None
+    if cached is not None and not cached["rows"]:
+        # 파싱 결과가 없거나 비어 있는 항목(200으로 온 오류·빈 페이지 등)은 캐시 미스로 보고
+        # 조건 없이 다시 요청 (재시도가 같은 빈 결과를 받지 않도록)
+        cached = None
+    if cached and cached["fresh"]:
+        print(f"  캐시 사용 (TTL 이내): {url}")
+        PAGE_CACHE.inc(result="fresh")
+        return None, cached["rows"]
+
+    response = fetch_page_response(url, extra_headers=HttpCache.conditional_headers(cached))
+    if response is None:
+        return None, None
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+
+    if response.status_code == 304:
+        if cached is not None:
+            cache.revalidated(url, etag, last_modified)
+            print(f"  변경 없음 (304): {url}")
+            PAGE_CACHE.inc(result="not_modified")
+            return None, cached["rows"]
+        # 조건부 헤더 없이 보낸 요청에 304가 온 경우 한 번 더 요청
+        response = fetch_page_response(url)
+        if response is None or response.status_code == 304:
+            return None, None
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+
+    body = response.text
+    if cached and content_hash(body) == cached["content_hash"]:
+        # 서버가 조건부 요청을 지원하지 않아도 본문 해시가 같으면 파싱 생략
+        cache.revalidated(url, etag, last_modified)
+        print(f"  변경 없음 (본문 해시 동일): {url}")
+        PAGE_CACHE.inc(result="same_hash")
+        return None, cached["rows"]
+    PAGE_CACHE.inc(result="miss")
+    if cache:
+        cache.put(url, body, etag, last_modified)
+    return body, None
+
 def scrape_ftc_law_data(search_laword_cl_cd):
-    all_law_data = []
-    session = requests.Session()
-    
     # FTC 사이트의 실제 key 값 매핑 (select box value -> API key)
     KEY_MAPPING = {
         1: 299,   # 공정거래법
@@ -103,8 +194,22 @@ def scrape_ftc_law_data(search_laword_cl_cd):
     main_page_url = BASE_PAGE_URL.format(key=key_val, cd=f"{cd_val:02d}")
     
     print(f"\nProcessing: {main_page_url}")
-    main_soup = fetch_page(main_page_url, session=session)
-    if not main_soup: return pd.DataFrame()
+    body, cached_rows = fetch_page_cached(main_page_url)
+    if cached_rows is not None:
+        return pd.DataFrame(cached_rows)
+    if not body: return pd.DataFrame()
+
+    with PARSE_SECONDS.time(), profiling.span("parse", main_page_url):
+        all_law_data = parse_law_rows(BeautifulSoup(body, 'html.parser'))
+    cache = get_page_cache()
+    if cache and all_law_data:
+        # 빈 결과는 저장하지 않아 다음 시도에서 다시 요청·파싱
+        cache.set_rows(main_page_url, all_law_data)
+    return pd.DataFrame(all_law_data)
+
+def parse_law_rows(main_soup):
+    """카테고리 페이지의 법령 표를 행 목록(dict)으로 변환합니다."""
+    all_law_data = []
 
     # 카테고리명 추출
     category_name = ""
@@ -114,7 +219,7 @@ def scrape_ftc_law_data(search_laword_cl_cd):
 
     # 테이블 추출
     table = main_soup.select_one("div.tbl-wrap table") or main_soup.find('table')
-    if not table: return pd.DataFrame()
+    if not table: return all_law_data
 
     tbody = table.find('tbody')
     rows = tbody.find_all('tr') if tbody else table.find_all('tr')
@@ -199,7 +304,7 @@ def scrape_ftc_law_data(search_laword_cl_cd):
         
         all_law_data.append(law_entry)
 
-    return pd.DataFrame(all_law_data)
+    return all_law_data
 
 if __name__ == "__main__":
     all_dfs = []
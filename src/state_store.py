@@ -0,0 +1,856 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+# 진행 중으로 보는 작업 상태
+ACTIVE_STATES = ("queued", "running")
+# 작업 상태 컬럼 (params, extra는 JSON 문자열로 저장)
+JOB_COLUMNS = [
+    "id",
+    "type",
+    "lane",
+    "params",
+    "state",
+    "progress",
+    "total",
+    "message",
+    "error",
+    "extra",
+    "cancel_requested",
+    "owner",
+    "heartbeat",
+    "created_at",
+    "started_at",
+    "finished_at",
+]
+JSON_COLUMNS = ("params", "extra")
+
+
+class StateStore:
+    """여러 작업자 프로세스가 공유하는 작업 상태·수집 결과 저장소 (SQLite)
+
+    - jobs: 작업 상태와 진행률. 작업을 실행하는 프로세스가 heartbeat를 갱신
+    - job_items: 작업 항목별 처리 기록 (이어서 실행할 때 완료 항목을 건너뜀)
+    - render_tasks: PDF 렌더링 대기열. 작업자(worker.py)가 임대(lease)로 가져가 처리
+    - job_spans: 프로파일링한 작업의 단계·항목별 소요 시간 구간
+    - runs / run_parts / run_rows: 수집 실행(run)별 결과. 수집 중에는 카테고리 단위로
+      run_parts에 기록하고, 완료되면 run_rows로 합쳐 현재 결과(active_run)로 지정
+      (행마다 마지막으로 바뀐 data_version 기록)
+    - kv: data_version, active_run, pdf_zip_path 등 단일 값
+
+    연결은 스레드별로 따로 열고(WAL 모드), 여러 문장을 묶는 쓰기는
+    BEGIN IMMEDIATE로 프로세스 간에도 직렬화합니다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        with self._transaction() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    type TEXT NOT NULL,
+                    lane TEXT DEFAULT 'bulk',
+                    params TEXT,
+                    state TEXT NOT NULL,
+                    progress INTEGER DEFAULT 0,
+                    total INTEGER DEFAULT 0,
+                    message TEXT DEFAULT '',
+                    error TEXT,
+                    extra TEXT,
+                    cancel_requested INTEGER DEFAULT 0,
+                    owner TEXT,
+                    heartbeat REAL,
+                    created_at REAL,
+                    started_at REAL,
+                    finished_at REAL
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS job_items (
+                    job_id TEXT NOT NULL,
+                    item_key TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    attempts INTEGER DEFAULT 0,
+                    error TEXT,
+                    result TEXT,
+                    updated_at REAL,
+                    PRIMARY KEY (job_id, item_key)
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS render_tasks (
+                    task_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    job_id TEXT NOT NULL,
+                    item_key TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    pdf_path TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    attempts INTEGER DEFAULT 0,
+                    lease_owner TEXT,
+                    lease_expires REAL,
+                    available_at REAL,
+                    error TEXT,
+                    updated_at REAL,
+                    priority INTEGER DEFAULT 0,
+                    meta TEXT,
+                    UNIQUE (job_id, item_key)
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS render_tasks_state"
+                " ON render_tasks (state, available_at)"
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS job_spans (
+                    job_id TEXT NOT NULL,
+                    stage TEXT NOT NULL,
+                    item TEXT,
+                    thread TEXT,
+                    started_at REAL NOT NULL,
+                    duration REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS job_spans_job ON job_spans (job_id)")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS runs (
+                    run_id TEXT PRIMARY KEY,
+                    job_id TEXT,
+                    params TEXT,
+                    state TEXT NOT NULL,
+                    row_count INTEGER DEFAULT 0,
+                    created_at REAL,
+                    completed_at REAL
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS run_parts (
+                    run_id TEXT NOT NULL,
+                    part INTEGER NOT NULL,
+                    data TEXT NOT NULL,
+                    PRIMARY KEY (run_id, part)
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS run_rows (
+                    run_id TEXT NOT NULL,
+                    idx INTEGER NOT NULL,
+                    data TEXT NOT NULL,
+                    version INTEGER NOT NULL,
+                    PRIMARY KEY (run_id, idx)
+                )
+                """
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT)"
+            )
+            # 이전 버전에서 만든 저장소에 추가된 컬럼
+            self._add_column(conn, "jobs", "lane", "TEXT DEFAULT 'bulk'")
+            self._add_column(conn, "render_tasks", "priority", "INTEGER DEFAULT 0")
+            self._add_column(conn, "render_tasks", "meta", "TEXT")
+
+    @staticmethod
+    def _add_column(conn, table, column, definition):
+        columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if column not in columns:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    class _Transaction:
+        def __init__(self, conn):
+            self.conn = conn
+
+        def __enter__(self):
+            self.conn.execute("BEGIN IMMEDIATE")
+            return self.conn
+
+        def __exit__(self, exc_type, exc, tb):
+            self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+            return False
+
+    def _transaction(self):
+        return self._Transaction(self._conn())
+
+    # --- 작업 ---
+
+    @staticmethod
+    def _job_dict(row):
+        job = dict(zip(JOB_COLUMNS, row))
+        for column in JSON_COLUMNS:
+            job[column] = json.loads(job[column]) if job[column] else {}
+        job["cancel_requested"] = bool(job["cancel_requested"])
+        return job
+
+    def _check_limits(self, conn, job_type, lane, limits, conflicts, stale_after):
+        """heartbeat가 stale_after초 이상 끊긴 작업(작업자 종료 등)을 실패 처리한 뒤
+        실행 제한을 확인합니다. 반환값: 실행할 수 없으면 오류 메시지, 아니면 None
+
+        동시 실행 수(limits)는 같은 우선순위(lane)의 작업끼리 세고,
+        함께 실행할 수 없는 작업(conflicts)은 우선순위와 관계없이 확인합니다.
+        """
+        now = time.time()
+        placeholders = ", ".join("?" for _ in ACTIVE_STATES)
+        conn.execute(
+            f"UPDATE jobs SET state = 'failed', error = ?, finished_at = ?"
+            f" WHERE state IN ({placeholders}) AND heartbeat < ?",
+            ("작업자 응답 없음", now) + ACTIVE_STATES + (now - stale_after,),
+        )
+        active = {}
+        same_lane = 0
+        for active_type, active_lane, count in conn.execute(
+            f"SELECT type, lane, COUNT(*) FROM jobs WHERE state IN ({placeholders})"
+            " GROUP BY type, lane",
+            ACTIVE_STATES,
+        ):
+            active[active_type] = active.get(active_type, 0) + count
+            if active_type == job_type and (active_lane or "bulk") == lane:
+                same_lane = count
+        if same_lane >= limits.get(job_type, 1):
+            return "이미 같은 종류의 작업이 진행 중입니다."
+        if any(active.get(other) for other in conflicts.get(job_type, ())):
+            return "이미 다른 작업이 진행 중입니다."
+        return None
+
+    def claim_job(
+        self, job_id, job_type, lane, params, owner, limits, conflicts, stale_after
+    ):
+        """실행 제한을 확인하고 작업을 등록합니다 (확인과 등록은 한 트랜잭션).
+
+        반환값: 실행할 수 없으면 오류 메시지, 등록했으면 None
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            error = self._check_limits(conn, job_type, lane, limits, conflicts, stale_after)
+            if error:
+                return error
+            conn.execute(
+                "INSERT INTO jobs"
+                " (id, type, lane, params, state, extra, owner, heartbeat, created_at)"
+                " VALUES (?, ?, ?, ?, 'queued', '{}', ?, ?, ?)",
+                (
+                    job_id,
+                    job_type,
+                    lane,
+                    json.dumps(params, ensure_ascii=False),
+                    owner,
+                    now,
+                    now,
+                ),
+            )
+        return None
+
+    def reclaim_job(self, job_id, owner, limits, conflicts, stale_after):
+        """실패·취소된 작업을 이어서 실행하도록 다시 등록합니다.
+
+        반환값: 실행할 수 없으면 오류 메시지, 등록했으면 None
+        """
+        with self._transaction() as conn:
+            row = conn.execute("SELECT type, lane FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return "작업을 찾을 수 없습니다."
+            error = self._check_limits(
+                conn, row[0], row[1] or "bulk", limits, conflicts, stale_after
+            )
+            if error:
+                return error
+            # 응답 없는 작업은 위에서 failed로 바뀌므로 상태를 다시 확인
+            state = conn.execute("SELECT state FROM jobs WHERE id = ?", (job_id,)).fetchone()[0]
+            if state not in ("failed", "cancelled"):
+                return "실패하거나 취소된 작업만 이어서 실행할 수 있습니다."
+            conn.execute(
+                "UPDATE jobs SET state = 'queued', error = NULL, cancel_requested = 0,"
+                " finished_at = NULL, owner = ?, heartbeat = ? WHERE id = ?",
+                (owner, time.time(), job_id),
+            )
+        return None
+
+    def update_job(self, job_id, **fields):
+        if not fields:
+            return
+        values = [
+            json.dumps(v, ensure_ascii=False) if k in JSON_COLUMNS else v
+            for k, v in fields.items()
+        ]
+        assignments = ", ".join(f"{k} = ?" for k in fields)
+        self._conn().execute(
+            f"UPDATE jobs SET {assignments}, heartbeat = ? WHERE id = ?",
+            values + [time.time(), job_id],
+        )
+
+    def heartbeat(self, job_id):
+        self._conn().execute(
+            "UPDATE jobs SET heartbeat = ? WHERE id = ?", (time.time(), job_id)
+        )
+
+    def request_cancel(self, job_id):
+        """진행 중인 작업에 취소 플래그를 기록합니다. 반환값: 기록 여부"""
+        placeholders = ", ".join("?" for _ in ACTIVE_STATES)
+        cursor = self._conn().execute(
+            f"UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND state IN ({placeholders})",
+            (job_id,) + ACTIVE_STATES,
+        )
+        return cursor.rowcount > 0
+
+    def cancel_requested(self, job_id):
+        row = self._conn().execute(
+            "SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        return bool(row and row[0])
+
+    def get_job(self, job_id):
+        row = self._conn().execute(
+            f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        return self._job_dict(row) if row else None
+
+    def list_jobs(self, job_type=None, limit=50):
+        """최근 작업부터 반환합니다."""
+        query = f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs"
+        args = []
+        if job_type:
+            query += " WHERE type = ?"
+            args.append(job_type)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        args.append(limit)
+        return [self._job_dict(row) for row in self._conn().execute(query, args)]
+
+    def active_job_counts(self, stale_after):
+        """진행 중인 작업 수 {(type, lane): 건수}"""
+        placeholders = ", ".join("?" for _ in ACTIVE_STATES)
+        rows = self._conn().execute(
+            f"SELECT type, lane, COUNT(*) FROM jobs WHERE state IN ({placeholders})"
+            " AND heartbeat >= ? GROUP BY type, lane",
+            ACTIVE_STATES + (time.time() - stale_after,),
+        ).fetchall()
+        return {(job_type, lane or "bulk"): count for job_type, lane, count in rows}
+
+    def has_active_jobs(self, stale_after, job_type=None, lane=None):
+        placeholders = ", ".join("?" for _ in ACTIVE_STATES)
+        query = f"SELECT 1 FROM jobs WHERE state IN ({placeholders}) AND heartbeat >= ?"
+        args = ACTIVE_STATES + (time.time() - stale_after,)
+        if job_type:
+            query += " AND type = ?"
+            args += (job_type,)
+        if lane:
+            query += " AND lane = ?"
+            args += (lane,)
+        return self._conn().execute(query + " LIMIT 1", args).fetchone() is not None
+
+    def trim_jobs(self, keep):
+        """종료된 작업은 최근 keep건만 남깁니다 (항목 기록 포함)."""
+        placeholders = ", ".join("?" for _ in ACTIVE_STATES)
+        with self._transaction() as conn:
+            conn.execute(
+                f"DELETE FROM jobs WHERE state NOT IN ({placeholders}) AND id NOT IN"
+                f" (SELECT id FROM jobs WHERE state NOT IN ({placeholders})"
+                " ORDER BY created_at DESC LIMIT ?)",
+                ACTIVE_STATES + ACTIVE_STATES + (keep,),
+            )
+            conn.execute("DELETE FROM job_items WHERE job_id NOT IN (SELECT id FROM jobs)")
+            conn.execute(
+                "DELETE FROM render_tasks WHERE job_id NOT IN (SELECT id FROM jobs)"
+            )
+            conn.execute("DELETE FROM job_spans WHERE job_id NOT IN (SELECT id FROM jobs)")
+            conn.execute(
+                "DELETE FROM kv WHERE key >= 'profile:' AND key < 'profile;'"
+                " AND substr(key, 9) NOT IN (SELECT id FROM jobs)"
+            )
+
+    def record_items(self, job_id, items):
+        """작업 항목 처리 결과를 기록합니다.
+
+        items: [(항목 키, state('done' 또는 'failed'), 시도 횟수, 오류, 결과)]
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO job_items"
+                " (job_id, item_key, state, attempts, error, result, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        job_id,
+                        str(key),
+                        state,
+                        attempts,
+                        error,
+                        json.dumps(result, ensure_ascii=False) if result is not None else None,
+                        now,
+                    )
+                    for key, state, attempts, error, result in items
+                ),
+            )
+
+    def job_items(self, job_id, state=None):
+        """{항목 키: {state, attempts, error, result}}"""
+        query = "SELECT item_key, state, attempts, error, result FROM job_items WHERE job_id = ?"
+        args = [job_id]
+        if state:
+            query += " AND state = ?"
+            args.append(state)
+        return {
+            key: {
+                "state": item_state,
+                "attempts": attempts,
+                "error": error,
+                "result": json.loads(result) if result else None,
+            }
+            for key, item_state, attempts, error, result in self._conn().execute(query, args)
+        }
+
+    def record_spans(self, job_id, spans):
+        """spans: [(단계, 항목, 스레드 이름, 시작 시각, 소요 시간(초))]"""
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT INTO job_spans (job_id, stage, item, thread, started_at, duration)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                ((job_id,) + tuple(span) for span in spans),
+            )
+
+    def job_spans(self, job_id, offset=0, limit=1000, stage=None):
+        """(전체 구간 수, 시작 시각 순 구간 목록)"""
+        where = "WHERE job_id = ?"
+        args = [job_id]
+        if stage:
+            where += " AND stage = ?"
+            args.append(stage)
+        conn = self._conn()
+        total = conn.execute(f"SELECT COUNT(*) FROM job_spans {where}", args).fetchone()[0]
+        rows = conn.execute(
+            "SELECT stage, item, thread, started_at, duration FROM job_spans"
+            f" {where} ORDER BY started_at LIMIT ? OFFSET ?",
+            args + [limit, offset],
+        ).fetchall()
+        return total, [
+            {
+                "stage": stage_name,
+                "item": item,
+                "thread": thread,
+                "started_at": started_at,
+                "duration_ms": round(duration * 1000, 2),
+            }
+            for stage_name, item, thread, started_at, duration in rows
+        ]
+
+    def span_summary(self, job_id):
+        """단계별 {count, total_ms, avg_ms, max_ms} (총 소요 시간이 큰 단계부터)"""
+        rows = self._conn().execute(
+            "SELECT stage, COUNT(*), SUM(duration), MAX(duration) FROM job_spans"
+            " WHERE job_id = ? GROUP BY stage ORDER BY SUM(duration) DESC",
+            (job_id,),
+        ).fetchall()
+        return [
+            {
+                "stage": stage,
+                "count": count,
+                "total_ms": round(total * 1000, 1),
+                "avg_ms": round(total / count * 1000, 2),
+                "max_ms": round(longest * 1000, 1),
+            }
+            for stage, count, total, longest in rows
+        ]
+
+    # --- 수집 결과 ---
+
+    def _bump_version(self, conn):
+        row = conn.execute("SELECT value FROM kv WHERE key = 'data_version'").fetchone()
+        version = int(row[0]) + 1 if row else 1
+        conn.execute(
+            "INSERT OR REPLACE INTO kv (key, value) VALUES ('data_version', ?)",
+            (str(version),),
+        )
+        return version
+
+    def data_version(self):
+        row = self._conn().execute(
+            "SELECT value FROM kv WHERE key = 'data_version'"
+        ).fetchone()
+        return int(row[0]) if row else 0
+
+    # 현재 결과로 지정된 수집 실행
+    ACTIVE_RUN = "(SELECT value FROM kv WHERE key = 'active_run')"
+
+    def create_run(self, job_id=None, params=None):
+        """수집 실행을 등록합니다 (결과는 finish_run 전까지 현재 결과에 반영되지 않음)."""
+        run_id = f"{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        self._conn().execute(
+            "INSERT INTO runs (run_id, job_id, params, state, created_at)"
+            " VALUES (?, ?, ?, 'collecting', ?)",
+            (run_id, job_id, json.dumps(params or {}, ensure_ascii=False), time.time()),
+        )
+        return run_id
+
+    def add_run_part(self, run_id, part, rows):
+        """수집된 카테고리(part 순번) 결과를 바로 기록합니다."""
+        self._conn().execute(
+            "INSERT OR REPLACE INTO run_parts (run_id, part, data) VALUES (?, ?, ?)",
+            (run_id, part, json.dumps(rows, ensure_ascii=False)),
+        )
+
+    def get_run_parts(self, run_id):
+        """{part 순번: 행 목록}"""
+        return {
+            part: json.loads(data)
+            for part, data in self._conn().execute(
+                "SELECT part, data FROM run_parts WHERE run_id = ?", (run_id,)
+            )
+        }
+
+    def finish_run(self, run_id, keep=5):
+        """part 순서대로 결과를 합쳐 현재 결과로 지정합니다.
+
+        수집 실행은 현재 결과를 포함해 최근 keep건만 남깁니다. 반환값: 결과 행 수
+        합친 결과가 비어 있으면 현재 결과를 바꾸지 않고 실행을 failed로 표시한 뒤 0을 반환합니다
+        (part도 삭제하므로 이어서 실행하면 모든 part를 다시 수집).
+        """
+        with self._transaction() as conn:
+            rows = []
+            for (data,) in conn.execute(
+                "SELECT data FROM run_parts WHERE run_id = ? ORDER BY part", (run_id,)
+            ):
+                rows.extend(json.loads(data))
+            if not rows:
+                conn.execute("DELETE FROM run_parts WHERE run_id = ?", (run_id,))
+                conn.execute(
+                    "UPDATE runs SET state = 'failed', row_count = 0, completed_at = ?"
+                    " WHERE run_id = ?",
+                    (time.time(), run_id),
+                )
+                return 0
+            version = self._bump_version(conn)
+            conn.execute("DELETE FROM run_rows WHERE run_id = ?", (run_id,))
+            conn.executemany(
+                "INSERT INTO run_rows (run_id, idx, data, version) VALUES (?, ?, ?, ?)",
+                (
+                    (run_id, idx, json.dumps(row, ensure_ascii=False), version)
+                    for idx, row in enumerate(rows)
+                ),
+            )
+            conn.execute("DELETE FROM run_parts WHERE run_id = ?", (run_id,))
+            conn.execute(
+                "UPDATE runs SET state = 'complete', row_count = ?, completed_at = ?"
+                " WHERE run_id = ?",
+                (len(rows), time.time(), run_id),
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO kv (key, value) VALUES ('active_run', ?)", (run_id,)
+            )
+            self._prune_runs(conn, keep)
+        return len(rows)
+
+    def _prune_runs(self, conn, keep):
+        stale = [
+            run_id
+            for (run_id,) in conn.execute(
+                f"SELECT run_id FROM runs WHERE run_id != {self.ACTIVE_RUN}"
+                " ORDER BY created_at DESC LIMIT -1 OFFSET ?",
+                (max(keep - 1, 0),),
+            )
+        ]
+        for run_id in stale:
+            for table in ("run_rows", "run_parts", "runs"):
+                conn.execute(f"DELETE FROM {table} WHERE run_id = ?", (run_id,))
+
+    def set_rows(self, rows, job_id=None):
+        """결과 전체를 새 수집 실행으로 기록하고 현재 결과로 지정합니다."""
+        run_id = self.create_run(job_id)
+        self.add_run_part(run_id, 0, rows)
+        self.finish_run(run_id)
+        return run_id
+
+    def activate_run(self, run_id):
+        """완료된 이전 수집 실행을 현재 결과로 되돌립니다. 반환값: 성공 여부"""
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT 1 FROM runs WHERE run_id = ? AND state = 'complete'", (run_id,)
+            ).fetchone()
+            if row is None:
+                return False
+            version = self._bump_version(conn)
+            # 진행 이벤트 스트림이 전체 변경으로 인식하도록 모든 행의 버전을 갱신
+            conn.execute(
+                "UPDATE run_rows SET version = ? WHERE run_id = ?", (version, run_id)
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO kv (key, value) VALUES ('active_run', ?)", (run_id,)
+            )
+        return True
+
+    def active_run(self):
+        return self.get_value("active_run")
+
+    def list_runs(self):
+        active = self.active_run()
+        columns = ["run_id", "job_id", "params", "state", "row_count", "created_at", "completed_at"]
+        runs = []
+        for row in self._conn().execute(
+            f"SELECT {', '.join(columns)} FROM runs ORDER BY created_at DESC"
+        ):
+            run = dict(zip(columns, row))
+            run["params"] = json.loads(run["params"]) if run["params"] else {}
+            run["active"] = run["run_id"] == active
+            runs.append(run)
+        return runs
+
+    def update_rows(self, updates, run_id=None):
+        """{행 번호: 행 dict} 단위로 결과 행을 갱신합니다 (기본: 현재 결과).
+
+        반환값: 새 data_version
+        """
+        with self._transaction() as conn:
+            version = self._bump_version(conn)
+            run_id = run_id or conn.execute(
+                "SELECT value FROM kv WHERE key = 'active_run'"
+            ).fetchone()[0]
+            conn.executemany(
+                "UPDATE run_rows SET data = ?, version = ? WHERE run_id = ? AND idx = ?",
+                (
+                    (json.dumps(row, ensure_ascii=False), version, run_id, idx)
+                    for idx, row in updates.items()
+                ),
+            )
+        return version
+
+    def get_rows(self):
+        """현재 결과의 (data_version, 행 목록)을 같은 시점 기준으로 반환합니다."""
+        conn = self._conn()
+        conn.execute("BEGIN")
+        try:
+            version = self.data_version()
+            rows = [
+                json.loads(data)
+                for (data,) in conn.execute(
+                    f"SELECT data FROM run_rows WHERE run_id = {self.ACTIVE_RUN} ORDER BY idx"
+                )
+            ]
+        finally:
+            conn.execute("COMMIT")
+        return version, rows
+
+    def rows_since(self, version):
+        """version 이후 바뀐 행을 반환합니다. 반환값: (data_version, [(행 번호, 행 dict)])"""
+        conn = self._conn()
+        conn.execute("BEGIN")
+        try:
+            current = self.data_version()
+            rows = [
+                (idx, json.loads(data))
+                for idx, data in conn.execute(
+                    f"SELECT idx, data FROM run_rows WHERE run_id = {self.ACTIVE_RUN}"
+                    " AND version > ? ORDER BY idx",
+                    (version,),
+                )
+            ]
+        finally:
+            conn.execute("COMMIT")
+        return current, rows
+
+    def row_count(self):
+        return self._conn().execute(
+            f"SELECT COUNT(*) FROM run_rows WHERE run_id = {self.ACTIVE_RUN}"
+        ).fetchone()[0]
+
+    # --- PDF 렌더링 대기열 ---
+
+    def enqueue_render_tasks(self, job_id, tasks, priority=0):
+        """작업의 렌더링 항목을 대기열에 넣습니다 (완료되지 않은 이전 항목은 교체).
+
+        tasks: [(항목 키, url, 출력 폴더 기준 상대 경로, 머리글 정보 dict)]
+        priority: 높은 항목부터 임대 (interactive 작업의 항목이 bulk 작업보다 먼저 처리됨)
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "DELETE FROM render_tasks WHERE job_id = ? AND state != 'done'", (job_id,)
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO render_tasks"
+                " (job_id, item_key, url, pdf_path, state, available_at, updated_at, priority, meta)"
+                " VALUES (?, ?, ?, ?, 'pending', ?, ?, ?, ?)",
+                (
+                    (
+                        job_id,
+                        str(key),
+                        url,
+                        path,
+                        now,
+                        now,
+                        priority,
+                        json.dumps(meta or {}, ensure_ascii=False),
+                    )
+                    for key, url, path, meta in tasks
+                ),
+            )
+
+    def claim_render_task(self, owner, lease_seconds, job_id=None, stale_after=60):
+        """처리할 항목 하나를 임대합니다 (대기 중이거나 임대가 만료된 항목).
+
+        진행 중이 아닌 작업(실패·취소·완료, heartbeat가 stale_after초 이상 끊긴 작업)의 항목은
+        건너뜁니다. 남은 항목은 작업을 이어서 실행할 때 대기열에 다시 들어갑니다.
+        반환값: 항목 dict 또는 None
+        """
+        now = time.time()
+        placeholders = ", ".join("?" for _ in ACTIVE_STATES)
+        query = (
+            "SELECT task_id, job_id, item_key, url, pdf_path, attempts, meta FROM render_tasks"
+            " WHERE ((state = 'pending' AND available_at <= ?)"
+            " OR (state = 'leased' AND lease_expires < ?))"
+            f" AND job_id IN (SELECT id FROM jobs WHERE state IN ({placeholders})"
+            " AND heartbeat >= ?)"
+        )
+        args = [now, now, *ACTIVE_STATES, now - stale_after]
+        if job_id:
+            query += " AND job_id = ?"
+            args.append(job_id)
+        query += " ORDER BY priority DESC, task_id LIMIT 1"
+        with self._transaction() as conn:
+            row = conn.execute(query, args).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE render_tasks SET state = 'leased', attempts = attempts + 1,"
+                " lease_owner = ?, lease_expires = ?, updated_at = ? WHERE task_id = ?",
+                (owner, now + lease_seconds, now, row[0]),
+            )
+        task = dict(
+            zip(["task_id", "job_id", "item_key", "url", "pdf_path", "attempts", "meta"], row)
+        )
+        task["attempts"] += 1
+        task["meta"] = json.loads(task["meta"]) if task["meta"] else {}
+        return task
+
+    def complete_render_task(self, task, owner):
+        """렌더링 완료를 기록합니다 (작업 항목 기록 포함). 임대가 다른 작업자로 넘어갔으면 False"""
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE render_tasks SET state = 'done', error = NULL, updated_at = ?"
+                " WHERE task_id = ? AND lease_owner = ? AND state = 'leased'",
+                (now, task["task_id"], owner),
+            )
+            if cursor.rowcount == 0:
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO job_items"
+                " (job_id, item_key, state, attempts, error, result, updated_at)"
+                " VALUES (?, ?, 'done', ?, NULL, ?, ?)",
+                (
+                    task["job_id"],
+                    task["item_key"],
+                    task["attempts"],
+                    json.dumps(task["pdf_path"], ensure_ascii=False),
+                    now,
+                ),
+            )
+        return True
+
+    def fail_render_task(self, task, owner, error, max_attempts, backoff):
+        """렌더링 실패를 기록합니다. 시도 횟수가 남았으면 backoff*2^(n-1)초 뒤 다시 대기열로."""
+        now = time.time()
+        attempts = task["attempts"]
+        with self._transaction() as conn:
+            if attempts < max_attempts:
+                conn.execute(
+                    "UPDATE render_tasks SET state = 'pending', error = ?, available_at = ?,"
+                    " lease_owner = NULL, updated_at = ?"
+                    " WHERE task_id = ? AND lease_owner = ? AND state = 'leased'",
+                    (error, now + backoff * 2 ** (attempts - 1), now, task["task_id"], owner),
+                )
+                return
+            cursor = conn.execute(
+                "UPDATE render_tasks SET state = 'failed', error = ?, updated_at = ?"
+                " WHERE task_id = ? AND lease_owner = ? AND state = 'leased'",
+                (error, now, task["task_id"], owner),
+            )
+            if cursor.rowcount:
+                conn.execute(
+                    "INSERT OR REPLACE INTO job_items"
+                    " (job_id, item_key, state, attempts, error, result, updated_at)"
+                    " VALUES (?, ?, 'failed', ?, ?, NULL, ?)",
+                    (task["job_id"], task["item_key"], attempts, error, now),
+                )
+
+    def render_task_counts(self, job_id=None):
+        """{state: 건수} (pending, leased, done, failed), job_id 생략 시 대기열 전체"""
+        if job_id is None:
+            return dict(
+                self._conn().execute(
+                    "SELECT state, COUNT(*) FROM render_tasks GROUP BY state"
+                ).fetchall()
+            )
+        return dict(
+            self._conn().execute(
+                "SELECT state, COUNT(*) FROM render_tasks WHERE job_id = ? GROUP BY state",
+                (job_id,),
+            ).fetchall()
+        )
+
+    def cancel_render_tasks(self, job_id):
+        """아직 임대되지 않은 항목을 대기열에서 뺍니다."""
+        self._conn().execute(
+            "DELETE FROM render_tasks WHERE job_id = ? AND state = 'pending'", (job_id,)
+        )
+
+    # --- 단일 값 ---
+
+    def get_value(self, key, default=None):
+        row = self._conn().execute("SELECT value FROM kv WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_value(self, key, value):
+        self._conn().execute(
+            "INSERT OR REPLACE INTO kv (key, value) VALUES (?, ?)", (key, value)
+        )
+
+    def get_values(self, prefix):
+        """키가 prefix로 시작하는 {키: 값}"""
+        return dict(
+            self._conn().execute(
+                "SELECT key, value FROM kv WHERE key >= ? AND key < ?",
+                (prefix, prefix + "\uffff"),
+            ).fetchall()
+        )
+
+    def delete_value(self, key):
+        self._conn().execute("DELETE FROM kv WHERE key = ?", (key,))
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_state_store(default_dir):
+    """프로세스 공용 저장소 (경로: STATE_STORE_PATH, 기본 <output>/state.sqlite3)
+
+    gunicorn 작업자는 fork 이후 각자 연결을 열도록 프로세스 ID별로 생성합니다.
+    """
+    path = os.environ.get("STATE_STORE_PATH") or os.path.join(default_dir, "state.sqlite3")
+    key = (os.getpid(), path)
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = StateStore(path)
+        return _stores[key]
@@ -0,0 +1,221 @@
+"""PDF 렌더링 작업자
+
+공유 저장소(output/state.sqlite3 또는 STATE_STORE_PATH)의 렌더링 대기열에서
+항목을 임대해 PDF로 저장하고 결과를 기록합니다. 같은 저장소와 output 폴더를
+쓰는 작업자 프로세스를 늘리면 렌더링 처리량이 늘어납니다.
+
+저장소는 WAL 모드 SQLite이므로 작업자는 웹 서버와 같은 호스트에서만 실행합니다
+(WAL 공유 메모리 색인은 네트워크·공유 파일 시스템에서 동작하지 않아, 여러 호스트가
+같은 파일을 쓰면 저장소가 손상되거나 같은 항목을 두 작업자가 임대할 수 있음).
+
+실행: python src/worker.py
+"""
+import asyncio
+import contextlib
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+import traceback
+
+# 평면 import를 사용하므로 src를 경로에 추가 (python -m src.worker로 실행해도 동작)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import metrics
+import profiling
+from state_store import get_state_store
+from browser_pool import get_browser_pool
+from pdf_render import PdfRenderer, PAGE_TIMEOUT_MS
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OUTPUT_DIR = os.path.join(BASE_DIR, "output")
+
+# 임대 유지 시간(초): 이 시간 안에 결과를 기록하지 않은 항목은 다른 작업자가 가져감
+RENDER_LEASE_SECONDS = 180
+# 대기열이 비었을 때 다시 확인하는 간격(초)
+POLL_INTERVAL = 1.0
+# 작업자 하나가 동시에 렌더링하는 페이지 수
+RENDER_CONCURRENCY = 4
+# heartbeat가 이 시간(초) 이상 끊긴 작업의 항목은 렌더링하지 않음 (JOB_STALE_SECONDS)
+JOB_STALE_SECONDS = 60
+
+RENDER_SECONDS = metrics.histogram(
+    "ftc_pdf_render_seconds", "PDF 한 건 렌더링 시간", ("outcome",)
+)
+
+
+def worker_owner():
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+def run_worker(
+    store,
+    output_dir,
+    job_id=None,
+    stop=None,
+    idle=None,
+    attempts=3,
+    backoff=2.0,
+    lease_seconds=RENDER_LEASE_SECONDS,
+    poll_interval=POLL_INTERVAL,
+    concurrency=RENDER_CONCURRENCY,
+    page_timeout=PAGE_TIMEOUT_MS,
+    stale_after=JOB_STALE_SECONDS,
+):
+    """대기열의 항목을 임대해 최대 concurrency개 페이지를 동시에 렌더링합니다.
+
+    job_id: 지정하면 해당 작업의 항목만 처리
+    stop(): True를 반환하면 다음 항목을 가져가지 않고, 렌더링 중인 항목을 마친 뒤 종료
+    idle(): 가져갈 항목도 렌더링 중인 항목도 없을 때 호출, True를 반환하면 종료
+    (생략 시 계속 대기)
+    page_timeout: 페이지 한 건 로딩 제한 시간(ms)
+    stale_after: 진행 중인 작업으로 보는 heartbeat 기준(초), 그 밖의 작업 항목은 가져가지 않음
+
+    렌더링은 프로세스 공용 브라우저 풀(browser_pool)의 이벤트 루프에서 실행되며,
+    호출할 때마다 브라우저를 실행하지 않고 격리된 컨텍스트 하나를 받아 씁니다.
+    """
+    pool = get_browser_pool()
+    pool.run(
+        _run_worker(
+            pool,
+            profiling.current(),
+            store,
+            output_dir,
+            job_id,
+            stop,
+            idle,
+            attempts,
+            backoff,
+            lease_seconds,
+            poll_interval,
+            max(1, concurrency),
+            page_timeout,
+            stale_after,
+        )
+    )
+
+
+async def _run_worker(
+    pool,
+    profiler,
+    store,
+    output_dir,
+    job_id,
+    stop,
+    idle,
+    attempts,
+    backoff,
+    lease_seconds,
+    poll_interval,
+    concurrency,
+    page_timeout,
+    stale_after,
+):
+    # 저장소 호출과 stop/idle 콜백(대기할 수 있음)은 스레드에서 실행해
+    # 렌더링 중인 페이지와 다른 작업의 이벤트 처리가 멈추지 않도록 함
+    owner = worker_owner()
+    renderer = None
+    running = set()
+
+    def span(stage, item=None):
+        # 풀의 이벤트 루프는 여러 작업이 공유하므로 호출한 작업의 profiler에 직접 기록
+        if profiler is None:
+            return contextlib.nullcontext()
+        return profiler.timed(stage, item)
+
+    async def render(task):
+        pdf_path = os.path.join(output_dir, task["pdf_path"])
+        start = time.perf_counter()
+        try:
+            with span("render", task["item_key"]):
+                await renderer.render(task["url"], pdf_path, task["meta"])
+        except Exception as e:
+            RENDER_SECONDS.observe(time.perf_counter() - start, outcome="error")
+            print(f"WARNING: PDF save failed ({task['pdf_path']}, {task['attempts']}회 시도): {e}")
+            await asyncio.to_thread(store.fail_render_task, task, owner, str(e), attempts, backoff)
+        else:
+            RENDER_SECONDS.observe(time.perf_counter() - start, outcome="ok")
+            if not await asyncio.to_thread(store.complete_render_task, task, owner):
+                print(f"WARNING: 임대가 만료되어 결과를 기록하지 못했습니다: {task['pdf_path']}")
+
+    try:
+        while not (stop and await asyncio.to_thread(stop)):
+            while len(running) < concurrency:
+                task = await asyncio.to_thread(
+                    store.claim_render_task, owner, lease_seconds, job_id, stale_after
+                )
+                if task is None:
+                    break
+                if renderer is None:
+                    with span("browser_context"):
+                        renderer = await PdfRenderer(pool, page_timeout).start()
+                running.add(asyncio.ensure_future(render(task)))
+            if running:
+                # 한 건이라도 끝나면 빈 자리만큼 다시 임대
+                _, running = await asyncio.wait(
+                    running, timeout=poll_interval, return_when=asyncio.FIRST_COMPLETED
+                )
+                continue
+            if idle and await asyncio.to_thread(idle):
+                return
+            await asyncio.sleep(poll_interval)
+    finally:
+        if running:
+            await asyncio.wait(running)
+        if renderer is not None:
+            await renderer.close()
+
+
+def main():
+    try:
+        from dotenv import load_dotenv
+
+        load_dotenv(os.path.join(BASE_DIR, ".env"))
+    except ImportError:
+        pass
+
+    store = get_state_store(OUTPUT_DIR)
+    stopping = threading.Event()
+
+    def handle_signal(signum, frame):
+        print("작업자 종료 요청: 현재 항목을 마치고 종료합니다.")
+        stopping.set()
+
+    signal.signal(signal.SIGTERM, handle_signal)
+    signal.signal(signal.SIGINT, handle_signal)
+
+    print(f"PDF 렌더링 작업자 시작 ({socket.gethostname()}:{os.getpid()})")
+    # 렌더링 지표는 공유 저장소를 통해 웹 서버의 /metrics에 합쳐짐
+    metrics.REGISTRY.start_flusher(store)
+    while not stopping.is_set():
+        try:
+            run_worker(
+                store,
+                OUTPUT_DIR,
+                stop=stopping.is_set,
+                attempts=int(os.environ.get("JOB_ITEM_ATTEMPTS", "3")),
+                backoff=float(os.environ.get("JOB_RETRY_BACKOFF", "2")),
+                lease_seconds=float(
+                    os.environ.get("RENDER_LEASE_SECONDS", str(RENDER_LEASE_SECONDS))
+                ),
+                concurrency=int(
+                    os.environ.get("PDF_RENDER_CONCURRENCY", str(RENDER_CONCURRENCY))
+                ),
+                page_timeout=float(os.environ.get("PDF_PAGE_TIMEOUT", "60")) * 1000,
+                stale_after=float(
+                    os.environ.get("JOB_STALE_SECONDS", str(JOB_STALE_SECONDS))
+                ),
+            )
+        except Exception:
+            # 저장소 오류 등으로 중단되면 잠시 후 다시 시작 (임대 중이던 항목은 만료 후 재처리,
+            # 종료된 브라우저는 풀이 다시 실행)
+            traceback.print_exc()
+            stopping.wait(5)
+    get_browser_pool().close()
+    metrics.REGISTRY.flush(store)
+
+
+if __name__ == "__main__":
+    main()